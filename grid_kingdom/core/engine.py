@@ -4,39 +4,60 @@
 负责初始化Pygame，管理游戏主循环，处理全局事件，以及驱动状态管理器。
 """
 import pygame
+from typing import List, Optional
 from grid_kingdom.utils.logger import logger
 from grid_kingdom.core.game_state_manager import GameStateManager, PlaceholderState, GameMainState 
 from grid_kingdom.utils import constants as C
 
-# --- 游戏常量 (后续可以移到config或constants模块) ---
-SCREEN_WIDTH = 1280
-SCREEN_HEIGHT = 720
-FPS = 60
-WINDOW_TITLE = "方格王国 (Grid Kingdom) - Alpha v0.0.1"
-
 class GameEngine:
     def __init__(self):
-        pygame.init()
-        pygame.font.init()
+        pygame.init() # 已包含字体模块的初始化；字体本身由各状态在需要时才加载
         logger.info("Pygame initialized.")
 
         self.screen = pygame.display.set_mode((C.SCREEN_WIDTH, C.SCREEN_HEIGHT))
         pygame.display.set_caption(C.WINDOW_TITLE) # 使用常量中的中文标题
-        logger.info(f"Display mode set to {C.SCREEN_WIDTH}x{C.SCREEN_HEIGHT}.")
+        logger.info("Display mode set to %sx%s.", C.SCREEN_WIDTH, C.SCREEN_HEIGHT)
+
+        self._configure_event_filter()
+        # 全局事件处理表：每个事件只需一次字典查找，而不是逐个比较 event.type
+        self._event_handlers = {
+            pygame.QUIT: self._on_quit,
+            pygame.KEYDOWN: self._on_keydown,
+            pygame.WINDOWEXPOSED: self._on_window_exposed,
+        }
+        self._force_full_update: bool = True # 下一帧是否必须提交整屏（首帧、窗口重新露出时）
 
         self.clock = pygame.time.Clock()
         self.running = False
+        self._last_render_ms: int = 0 # 上一次渲染的时间戳（毫秒），用于空闲状态的限帧
+        self._last_event_pump_ms: int = 0 # 上一次泵事件队列的时间戳（毫秒），保证每帧最多泵一次
+        self._update_step: float = 1.0 / C.FIXED_UPDATE_HZ # 固定逻辑步长（秒）
+        self._update_accumulator: float = 0.0 # 尚未被逻辑更新消耗的累计时间（秒）
 
-        self.state_manager = GameStateManager()
         # 将自身引用传递给 state_manager，以便状态可以访问 engine 的属性 (如 screen)
-        # 这是一种简单的依赖注入形式，更好的方式可能是在 change_state 时传递必要参数
-        # 或者让状态直接从全局配置/引擎实例中获取所需信息
-        setattr(self.state_manager, 'engine_ref', self) 
+        self.state_manager = GameStateManager(engine=self)
 
         self._register_initial_states()
 
         logger.info("GameEngine initialized.")
 
+    def _configure_event_filter(self) -> None:
+        """
+        只允许游戏实际处理的事件类型进入SDL队列。
+        其余事件（窗口事件、手柄轴、文本输入等）在SDL层就被丢弃，不再为它们创建Python事件对象。
+        注意：MOUSEMOTION 需要保留，地块悬停高亮和按钮悬停状态都依赖它。
+        """
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([
+            pygame.QUIT,
+            pygame.KEYDOWN,
+            pygame.MOUSEMOTION,
+            pygame.MOUSEBUTTONDOWN,
+            pygame.MOUSEBUTTONUP,
+            pygame.WINDOWEXPOSED, # 窗口被遮挡后重新露出时，需要重新提交整屏画面
+        ])
+        logger.debug("Event filter configured: QUIT, KEYDOWN, MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP, WINDOWEXPOSED.")
+
     def _register_initial_states(self) -> None:
         logger.debug("Registering initial states...")
         
@@ -62,24 +83,70 @@ class GameEngine:
         if not self.state_manager.get_active_state():
             logger.critical("CRITICAL: GameStateManager has no active state after initial change_state call!")
         else:
-            logger.info(f"Initial active state set to: {self.state_manager.active_state_name}")
-
-    def _handle_events(self) -> None:
-        """处理Pygame事件队列。"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                logger.info("QUIT event received, stopping game.")
-            
-            # 将事件传递给当前活动状态处理
-            self.state_manager.handle_event(event)
+            logger.info("Initial active state set to: %s", self.state_manager.active_state_name)
+
+    def _handle_events(self, pending_event: Optional[pygame.event.Event] = None) -> None:
+        """
+        处理Pygame事件队列。
+
+        Args:
+            pending_event (Optional[pygame.event.Event]): 已经从队列中取出、尚未处理的事件
+                （空闲循环中 pygame.event.wait 返回的事件），排在本批事件的最前面。
+        """
+        # 每帧只泵一次SDL事件队列，然后一次性取出全部事件（get内部不再重复pump）
+        pygame.event.pump()
+        events = pygame.event.get(pump=False)
+        self._last_event_pump_ms = pygame.time.get_ticks()
+        if pending_event is not None:
+            events.insert(0, pending_event)
+        if not events:
+            return
+        events = self._coalesce_mouse_motion(events)
+        self._dispatch_events(events)
+
+    def _dispatch_events(self, events: List[pygame.event.Event]) -> None:
+        """
+        一次遍历处理一批事件：每个事件先查表执行全局处理（未注册的类型直接跳过），
+        再交给状态管理器转发给当前活动状态，与逐个事件处理时的先后顺序相同。
+        """
+        get_handler = self._event_handlers.get
+        handle_state_event = self.state_manager.handle_event
+        for event in events:
+            handler = get_handler(event.type)
+            if handler is not None:
+                handler(event)
+            handle_state_event(event)
+
+    @staticmethod
+    def _coalesce_mouse_motion(events: List[pygame.event.Event]) -> List[pygame.event.Event]:
+        """
+        连续的 MOUSEMOTION 事件只保留最后一个：悬停高亮和按钮悬停只关心最新的鼠标位置。
+        只合并相邻的移动事件，点击等其他事件与移动的先后顺序保持不变。
+        """
+        if len(events) < 2:
+            return events
+        motion = pygame.MOUSEMOTION
+        coalesced = []
+        for event in events:
+            if event.type == motion and coalesced and coalesced[-1].type == motion:
+                coalesced[-1] = event
+            else:
+                coalesced.append(event)
+        return coalesced
+
+    def _on_quit(self, event: pygame.event.Event) -> None:
+        self.running = False
+        logger.info("QUIT event received, stopping game.")
 
-            # 示例：全局按键处理 (例如截图、调试开关等)
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE: # ESC键退出
-                    self.running = False
-                    logger.info("ESCAPE key pressed, stopping game.")
+    def _on_keydown(self, event: pygame.event.Event) -> None:
+        # 示例：全局按键处理 (例如截图、调试开关等)
+        if event.key == pygame.K_ESCAPE: # ESC键退出
+            self.running = False
+            logger.info("ESCAPE key pressed, stopping game.")
 
+    def _on_window_exposed(self, event: pygame.event.Event) -> None:
+        # 屏幕Surface中仍保留着上一帧的内容，只需要重新整屏提交一次
+        self._force_full_update = True
 
     def _update(self, dt: float) -> None:
         """更新游戏逻辑。dt是增量时间。"""
@@ -90,24 +157,74 @@ class GameEngine:
         """渲染游戏画面。"""
         # self.screen.fill((0, 0, 0)) # 通常由当前状态负责填充背景
 
-        self.state_manager.render(self.screen)
+        dirty_rects = self.state_manager.render(self.screen)
 
-        pygame.display.flip() # 更新整个屏幕显示
+        if dirty_rects is None or self._force_full_update:
+            pygame.display.flip() # 更新整个屏幕显示
+            self._force_full_update = False
+        elif dirty_rects:
+            pygame.display.update(dirty_rects) # 只提交发生变化的区域
+        # 空列表：画面没有变化，不提交
 
     def run(self) -> None:
         """启动游戏主循环。"""
         self.running = True
         logger.info("Starting game loop...")
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0 # 获取增量时间（秒）
+            active_state = self.state_manager.get_active_state()
+            if active_state is not None and not active_state.wants_continuous_updates:
+                self._run_idle_frame()
+                continue
+
+            frame_time = self.clock.tick(C.FPS) / 1000.0 # 获取增量时间（秒）
 
-            self._handle_events()
-            self._update(dt)
+            self._handle_events() # 事件每帧只处理一次
+            self._run_fixed_updates(frame_time)
             self._render()
+            self._last_render_ms = pygame.time.get_ticks()
 
         logger.info("Game loop finished.")
         self.quit()
 
+    def _run_fixed_updates(self, frame_time: float) -> None:
+        """
+        固定步长更新：把本帧经过的时间累加起来，按固定步长执行零次或多次逻辑更新。
+        渲染帧率波动不会影响逻辑的步长；帧来晚时补足步数，但最多 MAX_UPDATE_STEPS_PER_FRAME 步。
+        """
+        step = self._update_step
+        accumulator = self._update_accumulator + frame_time
+        steps = 0
+        while accumulator >= step and steps < C.MAX_UPDATE_STEPS_PER_FRAME:
+            self._update(step)
+            accumulator -= step
+            steps += 1
+        if steps == C.MAX_UPDATE_STEPS_PER_FRAME and accumulator >= step:
+            logger.debug("Fixed update fell behind by %.3fs, dropping the backlog.", accumulator)
+            accumulator %= step # 丢弃追不上的部分，保留不足一步的余量
+        self._update_accumulator = accumulator
+
+    def _run_idle_frame(self) -> None:
+        """
+        静态状态下的一次循环：阻塞等待输入事件（最多一帧时长），而不是以固定帧率空转。
+        SDL会在系统事件循环中休眠，空闲界面的CPU占用接近于零。
+        """
+        frame_ms = 1000 // C.FPS
+        event = pygame.event.wait(timeout=frame_ms)
+        if event.type != pygame.NOEVENT:
+            # 事件队列每帧最多处理一次：距上次泵事件不足一帧时先休眠到帧边界，
+            # 让高频输入（如鼠标移动）在这段时间内积攒，之后一次性取出处理，而不是每个事件唤醒一次
+            elapsed = pygame.time.get_ticks() - self._last_event_pump_ms
+            if elapsed < frame_ms:
+                pygame.time.wait(frame_ms - elapsed)
+            self._handle_events(event) # 连同同一时刻已积压的其余事件一起处理
+
+        dt = self.clock.tick() / 1000.0 # 只计时，不限帧
+        self._update(dt)
+        now = pygame.time.get_ticks()
+        if now - self._last_render_ms >= frame_ms:
+            self._render()
+            self._last_render_ms = now
+
     def quit(self) -> None:
         """清理并退出游戏。"""
         logger.info("Quitting Pygame...")
@@ -3,17 +3,25 @@
 游戏状态管理器
 负责管理不同的游戏状态（场景）及其切换。
 """
+import logging
+import random
+from functools import partial
 import pygame # 确保 pygame 在文件顶部导入
-from typing import Optional, Dict, Type, List, Tuple
+from typing import Optional, Dict, Type, List, Tuple, Callable, TYPE_CHECKING
 
 from grid_kingdom.utils.logger import logger
 from grid_kingdom.utils import constants as C
+from grid_kingdom.utils.grid_math import pick_tile_index
 from grid_kingdom.game_objects.tile import Tile
 from grid_kingdom.ui.renderer import Renderer # 导入渲染器
 from grid_kingdom.systems.resource_system import ResourceSystem, ResourceType
 from grid_kingdom.game_objects.building import Building, ManaWell, WoodcutterHut # 导入建筑类
 from grid_kingdom.systems.turn_system import TurnSystem
 from grid_kingdom.ui.components.button import Button
+from grid_kingdom.ui.text_cache import render_text, clear_text_cache
+
+if TYPE_CHECKING: # 仅用于类型标注，避免与 engine.py 循环导入
+    from grid_kingdom.core.engine import GameEngine
 
 class BaseState:
     """
@@ -22,7 +30,15 @@ class BaseState:
     """
     def __init__(self, manager: 'GameStateManager'):
         self.manager = manager
-        logger.info(f"State '{self.__class__.__name__}' initialized.")
+        logger.info("State '%s' initialized.", self.__class__.__name__)
+
+    @property
+    def wants_continuous_updates(self) -> bool:
+        """
+        该状态是否需要按固定帧率持续更新。
+        返回False时，引擎会阻塞等待输入事件而不是空转，适用于没有动画的静态界面（如开始菜单）。
+        """
+        return True
 
     def handle_event(self, event) -> None:
         """处理输入事件。"""
@@ -32,82 +48,87 @@ class BaseState:
         """更新游戏逻辑，dt是自上一帧以来的时间（秒）。"""
         pass
 
-    def render(self, surface: pygame.Surface) -> None:
-        """将当前状态渲染到屏幕上。"""
-        pass
+    def render(self, surface: pygame.Surface) -> Optional[List[pygame.Rect]]:
+        """
+        将当前状态渲染到屏幕上。
+
+        Returns:
+            Optional[List[pygame.Rect]]: 本帧发生变化的屏幕区域。
+                None 表示整屏都已重绘（引擎会 flip 整个画面）；
+                列表表示只需提交这些区域（空列表表示画面无变化，无需提交）。
+        """
+        return None
 
     def on_enter(self, **kwargs) -> None:
         """当进入此状态时调用。kwargs可以传递参数。"""
-        logger.info(f"Entering state '{self.__class__.__name__}' with args: {kwargs}")
+        logger.info("Entering state '%s' with args: %s", self.__class__.__name__, kwargs)
 
     def on_exit(self) -> None:
         """当退出此状态时调用。"""
-        logger.info(f"Exiting state '{self.__class__.__name__}'.")
+        logger.info("Exiting state '%s'.", self.__class__.__name__)
 
 
 class GameStateManager:
     """
     管理游戏状态的切换。
     """
-    def __init__(self):
-        self.states: Dict[str, Type[BaseState]] = {} # 存储状态类，而不是实例
+    __slots__ = ('engine', 'states', 'active_state', 'active_state_name', '_no_state_surface')
+
+    def __init__(self, engine: Optional['GameEngine'] = None):
+        """
+        Args:
+            engine (Optional[GameEngine]): 所属的游戏引擎，状态可通过 manager.engine 访问屏幕等资源。
+        """
+        self.engine = engine
+        # 存储状态工厂（状态类本身或返回状态实例的函数），而不是实例；切换状态时直接调用
+        self.states: Dict[str, Callable[['GameStateManager'], BaseState]] = {}
         self.active_state: Optional[BaseState] = None
         self.active_state_name: Optional[str] = None
+        self._no_state_surface: Optional[pygame.Surface] = None # "无活动状态"提示文字，首次需要时渲染一次后复用
         logger.info("GameStateManager initialized.")
 
-    def register_state(self, name: str, state_class: Type[BaseState]) -> None:
+    def register_state(self, name: str, state_factory: Callable[['GameStateManager'], BaseState]) -> None:
         """
-        注册一个状态类。
+        注册一个状态工厂：状态类本身，或接收 GameStateManager 并返回 BaseState 实例的函数。
         在实际切换到该状态前，不会实例化。
         """
+        if not callable(state_factory):
+            logger.error("Cannot register state '%s': %r is not a state class or factory.", name, state_factory)
+            return
+        factory_name = getattr(state_factory, "__name__", repr(state_factory))
         if name in self.states:
-            logger.warning(f"State '{name}' already registered. Overwriting with {state_class.__name__}.")
-        self.states[name] = state_class
-        logger.info(f"State class '{state_class.__name__}' registered as '{name}'.")
+            logger.warning("State '%s' already registered. Overwriting with %s.", name, factory_name)
+        self.states[name] = state_factory
+        logger.info("State factory '%s' registered as '%s'.", factory_name, name)
 
     def change_state(self, name: str, **kwargs) -> None:
-        logger.debug(f"Attempting to change state to '{name}' with kwargs: {kwargs}")
-        if self.active_state:
-            logger.debug(f"Exiting current state: {self.active_state_name}")
-            self.active_state.on_exit()
-
-        if name not in self.states:
-            logger.error(f"State '{name}' not registered.")
+        logger.debug("Attempting to change state to '%s' with kwargs: %s", name, kwargs)
+        state_factory = self.states.get(name)
+        if state_factory is None:
+            logger.error("State '%s' not registered.", name)
             return
 
-        state_class_definition = self.states[name]
-        logger.debug(f"Found state definition for '{name}': {state_class_definition}")
+        if self.active_state:
+            logger.debug("Exiting current state: %s", self.active_state_name)
+            self.active_state.on_exit()
+            clear_text_cache() # 旧状态的字体和文本不会再用到
 
-        new_state_instance = None
+        # 注册表中的条目在 register_state 时已校验为可调用对象，这里直接调用工厂，不再做类型分派
         try:
-            if callable(state_class_definition): # 应该总是True，因为我们存的是类
-                logger.debug(f"Instantiating state '{name}' using callable: {state_class_definition}")
-                new_state_instance = state_class_definition(self) # 传入 GameStateManager 实例
-                logger.debug(f"Successfully instantiated '{name}': {new_state_instance}")
-            else:
-                # 这个分支理论上不应该执行，因为 register_state 强制了 Type[BaseState]
-                logger.error(f"State definition for '{name}' is not callable: {state_class_definition}")
-                self.active_state = None 
-                return
+            new_state_instance = state_factory(self) # 传入 GameStateManager 实例
         except Exception as e:
-            logger.critical(f"Error instantiating state '{name}' from {state_class_definition}: {e}", exc_info=True)
-            self.active_state = None
-            return
-
-        if not isinstance(new_state_instance, BaseState):
-            logger.error(f"Instantiated object for state '{name}' is not a BaseState subclass: {type(new_state_instance)}")
+            logger.critical("Error instantiating state '%s' from %s: %s", name, state_factory, e, exc_info=True)
             self.active_state = None
             return
 
         self.active_state = new_state_instance
         self.active_state_name = name
-        logger.info(f"Successfully changed active state to '{self.active_state_name}' (instance: {self.active_state}).")
+        logger.info("Successfully changed active state to '%s' (instance: %s).", name, new_state_instance)
 
         try:
-            if self.active_state:
-                self.active_state.on_enter(**kwargs)
+            new_state_instance.on_enter(**kwargs)
         except Exception as e:
-            logger.critical(f"Error during on_enter for state '{self.active_state_name}': {e}", exc_info=True)
+            logger.critical("Error during on_enter for state '%s': %s", name, e, exc_info=True)
 
     def get_active_state(self) -> Optional[BaseState]:
         return self.active_state
@@ -120,61 +141,82 @@ class GameStateManager:
         if self.active_state:
             self.active_state.update(dt)
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface) -> Optional[List[pygame.Rect]]:
+        """渲染当前活动状态，返回其脏矩形列表（含义见 BaseState.render）。"""
         if self.active_state:
-            self.active_state.render(surface)
+            return self.active_state.render(surface)
         else:
             surface.fill((50, 50, 50)) 
-            if not pygame.font.get_init(): pygame.font.init()
-            try:
-                font = pygame.font.SysFont("arial", 24)
-                text_surface = font.render("No active state.", True, (255, 255, 255))
-                text_rect = text_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
-                surface.blit(text_surface, text_rect)
-            except Exception as e:
-                logger.error(f"Error rendering no active state message: {e}")
+            if self._no_state_surface is None:
+                try:
+                    font = pygame.font.SysFont("arial", 24)
+                    text_surface = font.render("No active state.", True, (255, 255, 255))
+                    if pygame.display.get_surface() is not None:
+                        text_surface = text_surface.convert_alpha()
+                    self._no_state_surface = text_surface
+                except Exception as e:
+                    logger.error("Error rendering no active state message: %s", e)
+                    return None
+            text_rect = self._no_state_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
+            surface.blit(self._no_state_surface, text_rect)
+            return None
 
 
 # --- 示例状态 (开始菜单) ---
 class PlaceholderState(BaseState):
     """一个占位符状态，用于演示开始菜单。"""
+    # 所有占位界面共用的字体。SysFont 首次调用需要枚举系统字体，开销较大；
+    # 状态每次切换都会重新实例化，因此在类上缓存，只加载一次
+    _shared_font: Optional[pygame.font.Font] = None
+
     def __init__(self, manager: GameStateManager, color: tuple = (100, 100, 200), text: str = "Placeholder State"):
         super().__init__(manager)
         self.color = color
         self.text = text
         self.font: Optional[pygame.font.Font] = None
+        self._needs_redraw: bool = True # 静态界面只在内容变化后重绘一次
+
+    @property
+    def wants_continuous_updates(self) -> bool:
+        """占位界面是静态的，只需在有输入时响应。"""
+        return False
 
     def on_enter(self, **kwargs) -> None:
         super().on_enter(**kwargs)
-        if not pygame.font.get_init(): # 直接使用顶部的 pygame
-            pygame.font.init()
-        try:
-            self.font = pygame.font.SysFont("arial", 48)
-        except Exception as e:
-            logger.error(f"Failed to load font in PlaceholderState: {e}")
+        if PlaceholderState._shared_font is None:
+            try:
+                PlaceholderState._shared_font = pygame.font.SysFont("arial", 48)
+            except Exception as e:
+                logger.error("Failed to load font in PlaceholderState: %s", e)
+        self.font = PlaceholderState._shared_font
 
         if 'message' in kwargs:
             self.text = kwargs['message']
-            logger.info(f"PlaceholderState received message: {self.text}")
+            logger.info("PlaceholderState received message: %s", self.text)
+        self._needs_redraw = True
 
     def handle_event(self, event: pygame.event.Event) -> None:
         super().handle_event(event)
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
-                logger.info(f"Space pressed in {self.__class__.__name__}. Triggering state change.")
+                logger.info("Space pressed in %s. Triggering state change.", self.__class__.__name__)
                 # 根据当前文本内容决定切换到哪个状态
                 if "Start Screen" in self.text: # 简单判断
                     self.manager.change_state("game_main", difficulty="normal")
                 else: # 其他情况都返回开始菜单（或特定逻辑）
                      self.manager.change_state("start_menu", message="Welcome Back to Start Screen!")
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface) -> Optional[List[pygame.Rect]]:
         super().render(surface)
+        if not self._needs_redraw:
+            return [] # 画面与上一帧相同，不需要提交任何区域
         surface.fill(self.color)
         if self.font:
             text_surface = self.font.render(self.text, True, (255, 255, 255))
             text_rect = text_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
             surface.blit(text_surface, text_rect)
+        self._needs_redraw = False
+        return None
 
 
 # --- 主游戏场景状态 ---
@@ -186,16 +228,37 @@ class GameMainState(BaseState):
     def __init__(self, manager: GameStateManager):
         super().__init__(manager)
         self.renderer: Optional[Renderer] = None
-        self.tiles: List[List[Tile]] = []
+        # 地块以行优先顺序存放在一维列表中：索引 = grid_y * grid_width_tiles + grid_x
+        # 相比列表的列表少一层间接寻址，遍历时内存更连续
+        self.tiles: List[Tile] = []
         self.grid_width_tiles: int = 20
         self.grid_height_tiles: int = 15
         self.tile_size: int = 32
+        # tile_size 为2的幂时，像素坐标→网格坐标可以用右移代替整除（鼠标移动时每个事件都会换算一次）
+        self._tile_shift: Optional[int] = (self.tile_size.bit_length() - 1) if self.tile_size & (self.tile_size - 1) == 0 else None
         
         self.font_debug: Optional[pygame.font.Font] = None # 用于调试信息
         self.font_ui_small: Optional[pygame.font.Font] = None # 用于资源、回合等小文本
         self.font_ui_button: Optional[pygame.font.Font] = None # 用于按钮文本
         
         self.hovered_tile: Optional[Tile] = None
+        # 上一次悬停判断的输入 (地块, 建筑模式, 选中建筑类)；鼠标在同一格内移动时无需重复计算
+        self._last_hover_key: Optional[Tuple[Optional[Tile], bool, Optional[Type[Building]]]] = None
+        # 建筑放置预览用的半透明方块（可放置/不可放置各一张），在 _setup_ui_elements 中创建一次
+        self._preview_ok_surface: Optional[pygame.Surface] = None
+        self._preview_bad_surface: Optional[pygame.Surface] = None
+        # 上一次绘制时的画面状态，用于判断本帧需要提交哪些区域（见 render）
+        self._last_view_key: Optional[tuple] = None
+        self._last_drawn_hover: Optional[Tuple[Optional[Tile], bool]] = None
+        self._last_button_states: Optional[List[tuple]] = None
+        # 资源栏的 (资源版本号, 字体, blit序列)；资源没有变化时直接复用，不再逐项查询数量和上限
+        self._resource_bar_cache: Optional[Tuple[int, pygame.font.Font, List[Tuple[pygame.Surface, Tuple[int, int]]]]] = None
+        # 事件处理表：每个事件只需一次字典查找，而不是逐个比较 event.type
+        self._event_handlers = {
+            pygame.KEYDOWN: self._on_keydown,
+            pygame.MOUSEMOTION: self._on_mouse_motion,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_button_down,
+        }
         
         initial_player_resources = {
             ResourceType.WOOD: 100, ResourceType.STONE: 50, ResourceType.FOOD: 20,
@@ -211,33 +274,44 @@ class GameMainState(BaseState):
         self.turn_system.register_on_turn_end_callback(self._process_buildings_turn_logic)
         
         self.buildings: List[Building] = []  
+        # 空间索引：建筑占据的每个地块坐标 -> 建筑。按位置查询为O(1)，区域查询只需遍历区域内的格子
+        self.buildings_by_pos: Dict[Tuple[int, int], Building] = {}
+        # 建筑增删或激活状态变化时加1；_view_key 据此判断建筑画面是否变化，不必每帧遍历建筑列表
+        self._buildings_version: int = 0
         self.available_buildings_to_build: List[Type[Building]] = [WoodcutterHut, ManaWell]
+        # 可建造建筑的显示信息预先算好：建筑类 -> (中文名, 预览用的首字)，悬停/点击/绘制时直接查表
+        self._building_meta: Dict[Type[Building], Tuple[str, str]] = {
+            bc: self._describe_building_class(bc) for bc in self.available_buildings_to_build
+        }
         self.selected_building_type_to_build: Optional[Type[Building]] = None
         self.build_mode: bool = False
         self.placement_valid: bool = False       
         
         self.next_turn_button: Optional[Button] = None
         self.building_selection_buttons: List[Button] = []     
+        self._btn_by_type: Dict[Type[Building], Button] = {} # 建筑类 -> 对应的选择按钮
+        self._active_build_btn: Optional[Button] = None # 当前高亮的建筑选择按钮
+        self._hud_button_list: List[Button] = [] # HUD上的全部按钮，在 _setup_ui_elements 中生成一次
 
     def _load_font(self, font_path: str, size: int) -> Optional[pygame.font.Font]:
         """尝试加载指定路径的字体，如果失败则尝试备用系统字体。"""
         try:
             return pygame.font.Font(font_path, size)
         except pygame.error as e: # Pygame相关的错误，如字体文件找不到
-            logger.error(f"Failed to load font from path '{font_path}' (size {size}): {e}")
+            logger.error("Failed to load font from path '%s' (size %s): %s", font_path, size, e)
             try:
-                logger.warning(f"Attempting to load fallback system font '{C.FALLBACK_FONT_NAME}' (size {size}). May not support Chinese.")
+                logger.warning("Attempting to load fallback system font '%s' (size %s). May not support Chinese.", C.FALLBACK_FONT_NAME, size)
                 return pygame.font.SysFont(C.FALLBACK_FONT_NAME, size)
             except Exception as sys_e:
-                logger.critical(f"Failed to load fallback system font '{C.FALLBACK_FONT_NAME}': {sys_e}")
+                logger.critical("Failed to load fallback system font '%s': %s", C.FALLBACK_FONT_NAME, sys_e)
                 return None # 彻底失败
         except Exception as e_gen: # 其他未知错误
-            logger.critical(f"An unexpected error occurred while loading font '{font_path}': {e_gen}")
+            logger.critical("An unexpected error occurred while loading font '%s': %s", font_path, e_gen)
             return None
 
     def on_enter(self, **kwargs) -> None:
         super().on_enter(**kwargs)
-        engine_instance = getattr(self.manager, 'engine_ref', None) 
+        engine_instance = self.manager.engine
         screen_width_for_ui, screen_height_for_ui = C.SCREEN_WIDTH, C.SCREEN_HEIGHT
         if engine_instance and hasattr(engine_instance, 'screen'):
             screen_surface = engine_instance.screen
@@ -251,22 +325,29 @@ class GameMainState(BaseState):
         
         self._initialize_grid()
         
-        if not pygame.font.get_init(): pygame.font.init()
-        
         # 加载字体
         self.font_debug = self._load_font(C.DEFAULT_FONT_PATH, 20) # 调试信息用小一点的字
         self.font_ui_small = self._load_font(C.DEFAULT_FONT_PATH, 18) # UI小文本
-        self.font_ui_button = self._load_font(C.DEFAULT_FONT_PATH, 20) # 按钮文本
+        self.font_ui_button = self.font_debug # 按钮文本：与调试信息同一字体同一字号，共用一个Font对象，不再重复加载字体文件
         if not all([self.font_debug, self.font_ui_small, self.font_ui_button]):
             logger.error("One or more fonts failed to load. UI text might not render correctly or at all.")
         self._setup_ui_elements(screen_width_for_ui, screen_height_for_ui)
-        logger.info(f"GameMainState entered. Grid: {self.grid_width_tiles}x{self.grid_height_tiles}, TileSize: {self.tile_size}")
-        logger.info(f"Initial resources: {self.resource_system.get_all_resources_str()}")
-        logger.info(f"Current Turn: {self.turn_system.current_turn}")
+        logger.info("GameMainState entered. Grid: %sx%s, TileSize: %s", self.grid_width_tiles, self.grid_height_tiles, self.tile_size)
+        if logger.isEnabledFor(logging.INFO): # 资源字符串需要拼接，只在确实输出时才生成
+            logger.info("Initial resources: %s", self.resource_system.get_all_resources_str())
+        logger.info("Current Turn: %s", self.turn_system.current_turn)
         self._create_initial_building_for_test()
 
+    @staticmethod
+    def _describe_building_class(building_class: Type[Building]) -> Tuple[str, str]:
+        """返回建筑类的 (显示名, 首字)。优先使用 CHINESE_NAME，没有时退回类名。"""
+        display_name = getattr(building_class, "CHINESE_NAME", None) or building_class.__name__
+        return display_name, display_name[0]
+
     def _setup_ui_elements(self, screen_width: int, screen_height: int) -> None:
         """初始化和设置UI元素，如按钮。"""
+        self._preview_ok_surface = self._create_preview_surface((0, 255, 0, 100))
+        self._preview_bad_surface = self._create_preview_surface((255, 0, 0, 100))
         if self.font_ui_button:
             # 结束回合按钮
             btn_end_turn_width = 160 # 增加宽度以容纳中文
@@ -285,6 +366,8 @@ class GameMainState(BaseState):
             logger.info("Next Turn button created.")
             # 建筑选择按钮
             self.building_selection_buttons.clear()
+            self._btn_by_type.clear()
+            self._active_build_btn = None
             build_btn_start_x = 20
             build_btn_width = 120 # 调整宽度
             build_btn_height = 30
@@ -292,201 +375,269 @@ class GameMainState(BaseState):
             # 建筑选择按钮放在底部UI条
             build_btn_y = screen_height - build_btn_height - ( (50 - build_btn_height) // 2 ) - 5 # 50是底部条高度
             for i, building_class in enumerate(self.available_buildings_to_build):
-                # 动态获取建筑的中文名 (假设建筑类有 'CHINESE_NAME' 类属性，或者从其他地方获取)
-                # 为简单起见，我们暂时硬编码或用一个辅助函数
-                building_display_name = getattr(building_class, "CHINESE_NAME", building_class.__name__)
+                building_display_name = self._building_meta[building_class][0]
                 button = Button(
                     rect=pygame.Rect(build_btn_start_x + i * (build_btn_width + build_btn_padding), 
                                     build_btn_y, build_btn_width, build_btn_height),
                     text=f"[{i+1}] {building_display_name}",
                     font=self.font_ui_button, # 使用按钮字体
-                    on_click=lambda bc=building_class: self._select_building_to_build(bc), # 使用lambda传递参数
+                    on_click=partial(self._select_building_to_build, building_class),
                     bg_color=C.COLOR_DARK_GREY,
-                    hover_bg_color=C.COLOR_GREY
+                    hover_bg_color=C.COLOR_GREY,
+                    highlight_bg_color=C.COLOR_YELLOW, # 当前选中的建筑用不同的高亮色
+                    data=building_class # 按钮对应的建筑类，用于判断高亮
                 )
                 self.building_selection_buttons.append(button)
-            logger.info(f"{len(self.building_selection_buttons)} building selection buttons created.")
+                self._btn_by_type[building_class] = button
+            logger.info("%s building selection buttons created.", len(self.building_selection_buttons))
+            self._hud_button_list = self.building_selection_buttons + [self.next_turn_button]
         else:
             logger.error("Cannot create UI buttons, UI font not loaded.")
     
+    def _create_preview_surface(self, color: Tuple[int, int, int, int]) -> pygame.Surface:
+        """创建一个地块大小、填充半透明颜色的预览Surface。"""
+        preview_surface = pygame.Surface((self.tile_size, self.tile_size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            preview_surface = preview_surface.convert_alpha()
+        preview_surface.fill(color)
+        return preview_surface
+
     def _select_building_to_build(self, building_class: Type[Building]):
         """处理建筑选择按钮的点击事件。"""
         self.selected_building_type_to_build = building_class
         self.build_mode = True
         # 获取建筑中文名用于日志
-        building_display_name = getattr(building_class, "CHINESE_NAME", building_class.__name__)
-        logger.info(f"已选择建筑: {building_display_name}. 进入建筑模式.")
+        building_display_name = self._building_meta[building_class][0]
+        logger.info("已选择建筑: %s. 进入建筑模式.", building_display_name)
 
 
     def _create_initial_building_for_test(self):
         test_building_x, test_building_y = 5, 5
         if 0 <= test_building_x < self.grid_width_tiles and \
            0 <= test_building_y < self.grid_height_tiles and \
-           not self.tiles[test_building_y][test_building_x].is_occupied:
+           not self._tile_at(test_building_x, test_building_y).is_occupied:
             
             new_hut = WoodcutterHut(test_building_x, test_building_y, self.tile_size)
             if self.resource_system.spend_multiple_resources(new_hut.build_cost):
-                self.buildings.append(new_hut)
-                for occ_x, occ_y in new_hut.get_occupied_tiles():
-                    self.tiles[occ_y][occ_x].set_occupied(new_hut.id)
-                    self.tiles[occ_y][occ_x].set_type(new_hut.building_type)
-                logger.info(f"Test building {new_hut.name} created at ({test_building_x},{test_building_y}).")
+                self._add_building(new_hut)
+                logger.info("Test building %s created at (%s,%s).", new_hut.name, test_building_x, test_building_y)
             else:
-                logger.warning(f"Could not afford test building {new_hut.name}. Cost: {new_hut.build_cost}")
+                logger.warning("Could not afford test building %s. Cost: %s", new_hut.name, new_hut.build_cost)
         else:
-            logger.warning(f"Cannot place test building at ({test_building_x},{test_building_y}), tile might be invalid or occupied.")
+            logger.warning("Cannot place test building at (%s,%s), tile might be invalid or occupied.", test_building_x, test_building_y)
+
+    def _add_building(self, building: Building) -> None:
+        """登记一个新建筑：加入建筑列表和空间索引，并标记其占据的地块。"""
+        self.buildings.append(building)
+        for occ_x, occ_y in building.get_occupied_tiles():
+            self.buildings_by_pos[(occ_x, occ_y)] = building
+            occ_tile = self._tile_at(occ_x, occ_y)
+            occ_tile.set_occupied(building.id)
+            occ_tile.set_type(building.building_type)
+            self._invalidate_tile(occ_tile)
+        self._buildings_version += 1
+        self._last_hover_key = None # 地块占据情况变了，悬停格的可放置判断需要重新计算
+
+    def _remove_building(self, building: Building) -> None:
+        """移除一个建筑：从建筑列表和空间索引中删除，并释放其占据的地块。"""
+        self.buildings.remove(building)
+        for occ_x, occ_y in building.get_occupied_tiles():
+            self.buildings_by_pos.pop((occ_x, occ_y), None)
+            occ_tile = self._tile_at(occ_x, occ_y)
+            occ_tile.set_vacant()
+            occ_tile.set_type("empty")
+            self._invalidate_tile(occ_tile)
+        self._buildings_version += 1
+        self._last_hover_key = None
+
+    def _invalidate_tile(self, tile: Tile) -> None:
+        """地块类型变化后调用，只重画缓存地块层中的这一格。"""
+        if self.renderer: self.renderer.invalidate_tile(tile)
+
+    def get_buildings_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> List[Building]:
+        """
+        返回与网格矩形区域 [x0, x1) × [y0, y1) 相交的所有建筑（每个建筑只出现一次）。
+        区域较小时逐格查索引，区域大于已占据格子数时改为遍历索引本身，
+        因此开销为 O(min(区域面积, 已占据格子数))，而不是遍历整个网格。
+        """
+        index = self.buildings_by_pos
+        if (x1 - x0) * (y1 - y0) <= len(index):
+            candidates = (index.get((gx, gy)) for gy in range(y0, y1) for gx in range(x0, x1))
+            return [b for b in dict.fromkeys(candidates) if b is not None]
+        return list(dict.fromkeys(b for (gx, gy), b in index.items() if x0 <= gx < x1 and y0 <= gy < y1))
+
+    @staticmethod
+    def _random_tile_type() -> str:
+        """随机决定新地块的类型：20% 水，20% 草地，其余为空地。"""
+        rand_val = random.random()
+        if rand_val < 0.2: return "water"
+        if rand_val < 0.4: return "grass"
+        return "empty"
 
     def _initialize_grid(self) -> None:
         logger.info("--- Grid Initialization Started ---")
-        self.tiles = [] 
-        logger.debug(f"Initializing grid with {self.grid_height_tiles} rows, {self.grid_width_tiles} cols, tile size {self.tile_size}")
-        for y_coord in range(self.grid_height_tiles):
-            row: List[Tile] = []
-            for x_coord in range(self.grid_width_tiles):
-                # import random # 如果 random 只在这里用，可以放进来，否则放模块顶部
-                tile_type = "empty"
-                rand_val = pygame.math.Vector2(x_coord, y_coord).length() * 0.05 # 伪随机，基于坐标
-                # 或者使用 random 模块
-                import random
-                rand_val = random.random()
-
-                if rand_val < 0.2: tile_type = "water"
-                elif rand_val < 0.4: tile_type = "grass"
-                row.append(Tile(x_coord, y_coord, self.tile_size, tile_type=tile_type))
-            self.tiles.append(row)
+        logger.debug("Initializing grid with %s rows, %s cols, tile size %s", self.grid_height_tiles, self.grid_width_tiles, self.tile_size)
+        # 一次性生成整张按行优先存放的地块列表（列表推导按最终长度分配，不再逐个 append）
+        tile_size = self.tile_size
+        self.tiles = [
+            Tile(x_coord, y_coord, tile_size, tile_type=self._random_tile_type())
+            for y_coord in range(self.grid_height_tiles)
+            for x_coord in range(self.grid_width_tiles)
+        ]
         
-        if self.tiles and self.tiles[0]:
-            logger.info(f"Grid re-initialized. Example new tile [0][0] type: {self.tiles[0][0].tile_type}")
+        if self.tiles:
+            logger.info("Grid re-initialized. Example new tile [0][0] type: %s", self.tiles[0].tile_type)
         else:
             logger.warning("Grid re-initialization resulted in empty tiles list.")
         logger.info("--- Grid Initialization Finished ---") 
 
+    def _tile_at(self, grid_x: int, grid_y: int) -> Tile:
+        """按网格坐标取地块（不做边界检查，调用方需保证坐标有效）。"""
+        return self.tiles[grid_y * self.grid_width_tiles + grid_x]
+
     def _get_tile_at_mouse_pos(self, mouse_pos: Tuple[int, int]) -> Optional[Tile]:
         if not self.renderer: return None
         world_x = mouse_pos[0] + self.renderer.camera_offset_x
-        world_y = mouse_pos[1]+ self.renderer.camera_offset_y
-        grid_x = world_x // self.tile_size
-        grid_y = world_y // self.tile_size
-        if 0 <= grid_x < self.grid_width_tiles and 0 <= grid_y < self.grid_height_tiles:
-            try:
-                return self.tiles[grid_y][grid_x]
-            except IndexError:
-                logger.warning(f"IndexError in _get_tile_at_mouse_pos for grid ({grid_x},{grid_y}).")
-                return None
-        return None
+        world_y = mouse_pos[1] + self.renderer.camera_offset_y
+        index = pick_tile_index(world_x, world_y, self.tile_size,
+                                self.grid_width_tiles, self.grid_height_tiles, self._tile_shift)
+        return self.tiles[index] if index >= 0 else None
+
+    def _refresh_hovered_tile(self, mouse_pos: Tuple[int, int]) -> None:
+        """根据鼠标位置更新悬停地块，并在建筑模式下重新判断能否放置。"""
+        tile = self._get_tile_at_mouse_pos(mouse_pos)
+        # MOUSEMOTION 每移动一个像素就触发一次，同一格内的移动结果不变，直接跳过
+        hover_key = (tile, self.build_mode, self.selected_building_type_to_build)
+        if hover_key == self._last_hover_key:
+            return
+        self._last_hover_key = hover_key
+        self.hovered_tile = tile
+        if self.build_mode and self.selected_building_type_to_build and self.hovered_tile:
+            # 悬停地块由拾取得到，必然在网格内，不必再做一次边界检查
+            self.placement_valid = self._can_place_building_on_tile(self.selected_building_type_to_build, self.hovered_tile)
+        else:
+            self.placement_valid = False
 
     def _can_place_building_at(self, building_class: Type[Building], grid_x: int, grid_y: int) -> bool:
         if not (0 <= grid_x < self.grid_width_tiles and 0 <= grid_y < self.grid_height_tiles):
             return False
-        target_tile = self.tiles[grid_y][grid_x]
-        if target_tile.is_occupied:
-            return False
-        return True
+        return self._can_place_building_on_tile(building_class, self._tile_at(grid_x, grid_y))
+
+    def _can_place_building_on_tile(self, building_class: Type[Building], target_tile: Tile) -> bool:
+        """判断建筑能否放在给定地块上（调用方保证地块在网格内）。"""
+        return not target_tile.is_occupied
+
+    _BUTTON_EVENT_TYPES = frozenset((pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP))
 
     def handle_event(self, event: pygame.event.Event) -> None:
         super().handle_event(event)
+        event_type = event.type
+        # 按钮只关心鼠标事件，键盘等其他事件不再逐个传给按钮
+        if event_type in self._BUTTON_EVENT_TYPES:
+            # 事件传递给所有按钮
+            if self.next_turn_button: self.next_turn_button.handle_event(event)
+            for btn in self.building_selection_buttons: btn.handle_event(event)
+
+        # 按事件类型查表分派，未注册的类型直接跳过
+        handler = self._event_handlers.get(event_type)
+        if handler is not None:
+            handler(event)
+
+    def _is_over_button(self, mouse_pos: Tuple[int, int]) -> bool:
+        """鼠标是否位于任一按钮上。"""
+        if self.next_turn_button and self.next_turn_button.rect.collidepoint(mouse_pos):
+            return True
+        return any(btn.rect.collidepoint(mouse_pos) for btn in self.building_selection_buttons)
+
+    def _on_keydown(self, event: pygame.event.Event) -> None:
+        if event.key == pygame.K_ESCAPE:
+            if self.build_mode:
+                self.build_mode = False
+                self.selected_building_type_to_build = None
+                logger.info("建筑模式已取消.")
+            else:
+                self.manager.change_state("start_menu", message="已返回开始菜单!")
+        elif event.key == pygame.K_r: 
+            logger.info("按下 R 键. 重新初始化网格和建筑.")
+            self._initialize_grid()
+            self.buildings.clear() 
+            self.buildings_by_pos.clear()
+            self._buildings_version += 1
+            self._create_initial_building_for_test() 
+        # 移除通过数字键1,2选择建筑的逻辑，现在通过按钮点击
+        #elif event.key == pygame.K_n: # 移除N键回合，由按钮控制
+        #    self.turn_system.advance_turn() # 改为由按钮的on_click调用
+
+    def _on_mouse_motion(self, event: pygame.event.Event) -> None:
+        self._refresh_hovered_tile(pygame.mouse.get_pos())
+
+    def _on_mouse_button_down(self, event: pygame.event.Event) -> None:
         mouse_pos = pygame.mouse.get_pos()
-        # 事件传递给所有按钮
-        if self.next_turn_button: self.next_turn_button.handle_event(event)
-        for btn in self.building_selection_buttons: btn.handle_event(event)
-        
-        # 检查是否有按钮处理了点击，避免后续逻辑冲突
         # 注意：Button 的 on_click 在 MOUSEBUTTONUP 时触发，所以这里我们主要避免在按钮区域的 MOUSEDOWN 触发地块逻辑
-        clicked_on_a_button = False
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.next_turn_button and self.next_turn_button.rect.collidepoint(mouse_pos):
-                clicked_on_a_button = True
-            if not clicked_on_a_button:
-                for btn in self.building_selection_buttons:
-                    if btn.rect.collidepoint(mouse_pos):
-                        clicked_on_a_button = True
-                        break
-        
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                if self.build_mode:
-                    self.build_mode = False
-                    self.selected_building_type_to_build = None
-                    logger.info("建筑模式已取消.")
-                else:
-                    self.manager.change_state("start_menu", message="已返回开始菜单!")
-            elif event.key == pygame.K_r: 
-                logger.info("按下 R 键. 重新初始化网格和建筑.")
-                self._initialize_grid()
-                self.buildings.clear() 
-                self._create_initial_building_for_test() 
-            # 移除通过数字键1,2选择建筑的逻辑，现在通过按钮点击
-            #elif event.key == pygame.K_n: # 移除N键回合，由按钮控制
-            #    self.turn_system.advance_turn() # 改为由按钮的on_click调用
-        if event.type == pygame.MOUSEMOTION:
-            self.hovered_tile = self._get_tile_at_mouse_pos(mouse_pos)
-            if self.build_mode and self.selected_building_type_to_build and self.hovered_tile:
-                self.placement_valid = self._can_place_building_at(
-                    self.selected_building_type_to_build,
-                    self.hovered_tile.grid_x,
-                    self.hovered_tile.grid_y
-                )
-            else:
-                self.placement_valid = False
-        if event.type == pygame.MOUSEBUTTONDOWN and not clicked_on_a_button: # 只有当没点到按钮时
-            clicked_tile = self._get_tile_at_mouse_pos(mouse_pos)
-            if event.button == 1: # Left-click
-                if self.build_mode and self.selected_building_type_to_build and clicked_tile:
-                    if self.placement_valid:
-                        building_class = self.selected_building_type_to_build
-                        # 获取建筑中文名
-                        building_display_name = getattr(building_class, "CHINESE_NAME", building_class.__name__)
-                        temp_building_for_cost = building_class(clicked_tile.grid_x, clicked_tile.grid_y, self.tile_size)
-                        
-                        if self.resource_system.spend_multiple_resources(temp_building_for_cost.build_cost):
-                            new_building = building_class(clicked_tile.grid_x, clicked_tile.grid_y, self.tile_size)
-                            self.buildings.append(new_building)
-                            for occ_x, occ_y in new_building.get_occupied_tiles():
-                                self.tiles[occ_y][occ_x].set_occupied(new_building.id)
-                                self.tiles[occ_y][occ_x].set_type(new_building.building_type)
-                            logger.info(f"成功建造 {new_building.name} 于 ({clicked_tile.grid_x},{clicked_tile.grid_y}).") # new_building.name 已经是中文
-                            self.build_mode = False
-                            self.selected_building_type_to_build = None
-                        else:
-                            logger.warning(f"建造 {building_display_name} 失败. 资源不足. 所需: {temp_building_for_cost.build_cost}")
+        if event.button == 1 and self._is_over_button(mouse_pos):
+            return # 只有当没点到按钮时才处理地块
+        clicked_tile = self._get_tile_at_mouse_pos(mouse_pos)
+        if event.button == 1: # Left-click
+            if self.build_mode and self.selected_building_type_to_build and clicked_tile:
+                if self.placement_valid:
+                    building_class = self.selected_building_type_to_build
+                    # 获取建筑中文名
+                    building_display_name = self._building_meta[building_class][0]
+                    # 建造费用是实例属性，先创建候选建筑读取费用；支付成功就直接使用这个实例，不再重复创建
+                    new_building = building_class(clicked_tile.grid_x, clicked_tile.grid_y, self.tile_size)
+                    
+                    if self.resource_system.spend_multiple_resources(new_building.build_cost):
+                        self._add_building(new_building)
+                        logger.info("成功建造 %s 于 (%d,%d).", new_building.name, clicked_tile.grid_x, clicked_tile.grid_y) # new_building.name 已经是中文
+                        self.build_mode = False
+                        self.selected_building_type_to_build = None
                     else:
-                        logger.warning("此处无法建造 (已被占据或无效位置).")
-                elif clicked_tile: 
-                    logger.info(f"点击地块: {clicked_tile} (非建筑模式).")
-                    found_building_on_tile = next((b for b in self.buildings if (b.grid_x, b.grid_y) == (clicked_tile.grid_x, clicked_tile.grid_y)), None)
-                    if found_building_on_tile:
-                        logger.info(f"点击已有建筑: {found_building_on_tile.name}")
-                        refund_ratio = 0.5
-                        for res, amount in found_building_on_tile.build_cost.items():
-                            self.resource_system.add_resource(res, int(amount * refund_ratio))
-                        self.buildings.remove(found_building_on_tile)
-                        for occ_x, occ_y in found_building_on_tile.get_occupied_tiles():
-                            self.tiles[occ_y][occ_x].set_vacant()
-                            self.tiles[occ_y][occ_x].set_type("empty")
-                        logger.info(f"已拆除 {found_building_on_tile.name}. 部分资源已返还.")
+                        logger.warning("建造 %s 失败. 资源不足. 所需: %s", building_display_name, new_building.build_cost)
                 else:
-                    logger.info("左键点击网格外部.")
-            elif event.button == 3: # Right-click
-                if self.build_mode:
-                    self.build_mode = False
-                    self.selected_building_type_to_build = None
-                    logger.info("建筑模式已通过右键取消.")
+                    logger.warning("此处无法建造 (已被占据或无效位置).")
+            elif clicked_tile: 
+                if logger.isEnabledFor(logging.INFO): # Tile.__repr__ 只在确实会输出时才调用
+                    logger.info("点击地块: %r (非建筑模式).", clicked_tile)
+                found_building_on_tile = self.buildings_by_pos.get((clicked_tile.grid_x, clicked_tile.grid_y))
+                if found_building_on_tile:
+                    logger.info("点击已有建筑: %s", found_building_on_tile.name)
+                    refund_ratio = 0.5
+                    refund = {res: int(amount * refund_ratio) for res, amount in found_building_on_tile.build_cost.items()}
+                    refund = {res: amount for res, amount in refund.items() if amount > 0} # 向下取整后为0的不返还
+                    if refund:
+                        self.resource_system.add_multiple_resources(refund)
+                    self._remove_building(found_building_on_tile)
+                    logger.info("已拆除 %s. 部分资源已返还.", found_building_on_tile.name)
+            else:
+                logger.info("左键点击网格外部.")
+        elif event.button == 3: # Right-click
+            if self.build_mode:
+                self.build_mode = False
+                self.selected_building_type_to_build = None
+                logger.info("建筑模式已通过右键取消.")
 
 
     def _process_buildings_turn_logic(self): # 重命名以区分于TurnSystem的全局处理
         """处理本回合所有建筑的生产和维护。这是注册到TurnSystem的回调。"""
         logger.debug("--- GameMainState: Processing buildings turn logic ---")
+        # 先把所有建筑的产出汇总，再一次性入账：
+        # 资源系统只被调用一次，而不是建筑数×资源数次（上限截断的结果相同）
         produced_this_turn: Dict[ResourceType, int] = {}
-        for building in list(self.buildings): 
+        for building in self.buildings:
             if building.is_active:
                 produced = building.update_production()
                 if produced:
                     for res_type, amount in produced.items():
-                        self.resource_system.add_resource(res_type, amount)
                         produced_this_turn[res_type] = produced_this_turn.get(res_type, 0) + amount
-        if produced_this_turn: logger.info(f"Total building production this turn: {produced_this_turn}")
+        if produced_this_turn:
+            self.resource_system.add_multiple_resources(produced_this_turn)
+            logger.info("Total building production this turn: %s", produced_this_turn)
         
-        for building in self.buildings: building.pay_maintenance(self.resource_system)
+        for building in self.buildings:
+            was_active = building.is_active
+            building.pay_maintenance(self.resource_system)
+            if building.is_active != was_active: # 因维护费暂停或恢复，建筑外观随之变化
+                self._buildings_version += 1
         logger.debug("--- GameMainState: Buildings turn logic processed ---")
         # 全局资源消耗现在由 TurnSystem._process_global_turn_effects 处理
     
@@ -496,95 +647,69 @@ class GameMainState(BaseState):
         if self.next_turn_button: # 更新结束回合按钮文本
             self.next_turn_button.set_text(f"{C.TEXT_END_TURN_BUTTON} ({self.turn_system.current_turn})")
         
-        # 更新建筑选择按钮的状态 (例如，高亮当前选中的)
-        for btn in self.building_selection_buttons:
-            # 假设按钮的文本格式是 "[key] Name"
-            # 我们需要从按钮的on_click回调中绑定的建筑类来判断
-            # 这部分可以在 Button 类中增加一个 id 或 data 属性来简化
-            # 或者在创建按钮时就保存其对应的建筑类
-            # 简陋的判断：
-            # is_selected_button = False
-            # if self.selected_building_type_to_build and btn.text.endswith(self.selected_building_type_to_build.CHINESE_NAME if hasattr(self.selected_building_type_to_build, "CHINESE_NAME") else self.selected_building_type_to_build.__name__):
-            #    is_selected_button = True
-            #
-            # (更稳健的方式是在 _setup_ui_elements 中给按钮关联建筑类，然后在 Button 类中处理高亮)
-            # 目前Button类没有直接支持基于外部状态的高亮，我们可以在这里手动改颜色，但不推荐
-            # 最好是 Button 类有 set_highlighted(bool) 之类的方法
-            pass
+        # 更新建筑选择按钮的高亮：建筑模式下高亮当前选中建筑类对应的按钮，只在选中按钮变化时修改
+        target_btn = self._btn_by_type.get(self.selected_building_type_to_build) if self.build_mode else None
+        if target_btn is not self._active_build_btn:
+            if self._active_build_btn: self._active_build_btn.set_highlighted(False)
+            if target_btn: target_btn.set_highlighted(True)
+            self._active_build_btn = target_btn
+
+    def _text(self, text: str) -> pygame.Surface:
+        """返回用 font_ui_small 渲染的HUD文本Surface。资源/回合数很少变化，大部分帧命中缓存。"""
+        return render_text(self.font_ui_small, text, C.COLOR_LIGHT_GREY)
+
+    # 资源栏布局：显示顺序及各项的中文名，固定不变，不必每帧重新构造
+    _RESOURCE_BAR_ITEMS = (
+        (ResourceType.WOOD, C.TEXT_WOOD), (ResourceType.STONE, C.TEXT_STONE),
+        (ResourceType.FOOD, C.TEXT_FOOD), (ResourceType.GOLD, C.TEXT_GOLD),
+        (ResourceType.MANA, C.TEXT_MANA),
+    )
+    _RESOURCE_BAR_POS = (10, 10) # 第一项的左上角
+    _RESOURCE_BAR_PADDING = 15 # 相邻两项之间的间距
 
     def _draw_resource_ui(self, surface: pygame.Surface) -> None:
         if not self.font_ui_small: return
-        start_x, y_pos, padding = 10, 10, 15
-        
-        resource_map = { # 将枚举映射到中文文本
-            ResourceType.WOOD: C.TEXT_WOOD, ResourceType.STONE: C.TEXT_STONE,
-            ResourceType.FOOD: C.TEXT_FOOD, ResourceType.GOLD: C.TEXT_GOLD,
-            ResourceType.MANA: C.TEXT_MANA
-        }
-        resource_order = [ResourceType.WOOD, ResourceType.STONE, ResourceType.FOOD, ResourceType.GOLD, ResourceType.MANA]
-        for res_type in resource_order:
+        version = self.resource_system.version
+        cache = self._resource_bar_cache
+        if cache is not None and cache[0] == version and cache[1] is self.font_ui_small:
+            surface.blits(cache[2], False)
+            return
+        start_x, y_pos = self._RESOURCE_BAR_POS
+        padding = self._RESOURCE_BAR_PADDING
+        blit_sequence = [] # 先收集各项的 (Surface, 位置)，最后用一次 Surface.blits 批量绘制
+        for res_type, res_name in self._RESOURCE_BAR_ITEMS:
             amount = self.resource_system.get_resource_amount(res_type)
             cap = self.resource_system.get_resource_cap(res_type)
             cap_str = f"/{cap}" if cap is not None else ""
-            res_name = resource_map.get(res_type, res_type.name) # 获取中文名
             text = f"{res_name}: {amount}{cap_str}"
-            text_surface = self.font_ui_small.render(text, True, C.COLOR_LIGHT_GREY)
-            logger.debug(f"Rendered resource text '{text}': Surface={text_surface}, Size={text_surface.get_size() if text_surface else 'None'}")
-            surface.blit(text_surface, (start_x, y_pos))
+            text_surface = self._text(text)
+            blit_sequence.append((text_surface, (start_x, y_pos)))
             start_x += text_surface.get_width() + padding
+        surface.blits(blit_sequence, False) # 不需要返回每次blit的矩形
+        self._resource_bar_cache = (version, self.font_ui_small, blit_sequence)
             
-    def _draw_turn_info_ui(self, surface: pygame.Surface) -> None:
-        if not self.font_ui_small: return 
-        turn_text = f"{C.TEXT_TURN}: {self.turn_system.current_turn}"
-        text_surface = self.font_ui_small.render(turn_text, True, C.COLOR_LIGHT_GREY)
-        # 显示在资源区右侧
-        resource_ui_end_x = 10 # 估算资源区宽度，或动态计算
-        for res_type in [ResourceType.WOOD, ResourceType.STONE, ResourceType.FOOD, ResourceType.GOLD, ResourceType.MANA]:
-            res_name = getattr(C, f"TEXT_{res_type.name}", res_type.name)
-            amount = self.resource_system.get_resource_amount(res_type)
-            cap = self.resource_system.get_resource_cap(res_type)
-            cap_str = f"/{cap}" if cap is not None else ""
-            text = f"{res_name}: {amount}{cap_str}"
-            resource_ui_end_x += self.font_ui_small.size(text)[0] + 15
-            
-        text_rect = text_surface.get_rect(topleft=(resource_ui_end_x + 30, 10)) # 资源区右边30像素
-        surface.blit(text_surface, text_rect)
-
     def _draw_build_preview(self, surface: pygame.Surface):
         """绘制建筑放置预览。"""
         if self.build_mode and self.selected_building_type_to_build and self.hovered_tile:
-            preview_color = (0, 255, 0, 100) if self.placement_valid else (255, 0, 0, 100)
-            
             preview_rect = pygame.Rect(
                 self.hovered_tile.pixel_x - (self.renderer.camera_offset_x if self.renderer else 0),
                 self.hovered_tile.pixel_y - (self.renderer.camera_offset_y if self.renderer else 0),
                 self.tile_size,
                 self.tile_size
             )
-            temp_surface = pygame.Surface((self.tile_size, self.tile_size), pygame.SRCALPHA)
-            temp_surface.fill(preview_color)
-            surface.blit(temp_surface, (preview_rect.x, preview_rect.y))
+            preview_surface = self._preview_ok_surface if self.placement_valid else self._preview_bad_surface
+            if preview_surface is not None:
+                surface.blit(preview_surface, (preview_rect.x, preview_rect.y))
             
             # 可以在预览上显示建筑名称或图标
             if self.font_ui_small: # <--- 修改这里：使用 self.font_ui_small
+                building_name_char = self._building_meta[self.selected_building_type_to_build][1]
                 try:
-                    # 尝试获取建筑类的中文名或普通名，然后取首字母
-                    building_name_source = getattr(self.selected_building_type_to_build, "CHINESE_NAME", None)
-                    if not building_name_source: # 如果没有CHINESE_NAME，尝试普通name
-                        building_name_source = getattr(self.selected_building_type_to_build, "name", None)
-                    if not building_name_source: # 如果连name都没有（不太可能），用类名
-                        building_name_source = self.selected_building_type_to_build.__name__
-                    
-                    building_name_char = building_name_source[0] if building_name_source else "?"
-                except (AttributeError, IndexError): # 捕获可能发生的错误
-                    building_name_char = "?"
-                    logger.warning(f"Could not determine preview char for {self.selected_building_type_to_build}")
-                try:
-                    text_s = self.font_ui_small.render(building_name_char, True, C.COLOR_WHITE) # <--- 修改这里
+                    text_s = render_text(self.font_ui_small, building_name_char, C.COLOR_WHITE)
                     text_r = text_s.get_rect(center=preview_rect.center)
                     surface.blit(text_s, text_r)
                 except pygame.error as e: # 防御字体渲染错误
-                    logger.error(f"Error rendering build preview text char '{building_name_char}': {e}")
+                    logger.error("Error rendering build preview text char '%s': %s", building_name_char, e)
             elif not self.font_ui_small: # 如果字体未加载，记录一个警告
                 logger.warning("_draw_build_preview: font_ui_small not loaded, cannot draw preview text.")
 
@@ -594,33 +719,15 @@ class GameMainState(BaseState):
         if not self.font_ui_button: return
         ui_bar_height = 50
         ui_bar_y = surface.get_height() - ui_bar_height
-        pygame.draw.rect(surface, C.COLOR_VERY_DARK_GREY, (0, ui_bar_y, surface.get_width(), ui_bar_height))
-        for btn in self.building_selection_buttons:
-            # 更新按钮高亮状态 (如果当前选中且在建筑模式)
-            is_this_button_selected = False
-            # 我们需要一种方式从按钮实例判断它代表哪个建筑类
-            # 修改：在 _select_building_to_build 中直接设置按钮高亮，或按钮有active状态
-            # 暂时简单处理，如果按钮的文本包含已选中建筑的名称，则高亮（不完美）
-            if self.selected_building_type_to_build and self.build_mode:
-                # 假设按钮文本是 "[key] Name"
-                # 这需要确保按钮文本中的Name与建筑类的CHINESE_NAME一致
-                expected_name_in_btn_text = getattr(self.selected_building_type_to_build, "CHINESE_NAME", self.selected_building_type_to_build.__name__)
-                if expected_name_in_btn_text in btn.text: # 简单判断
-                    btn.bg_color = C.COLOR_YELLOW # 用一个不同的高亮色
-                    btn.hover_bg_color = C.COLOR_YELLOW
-                else:
-                    btn.bg_color = C.COLOR_DARK_GREY
-                    btn.hover_bg_color = C.COLOR_GREY
-            else: # 非建筑模式或无选中，所有按钮恢复默认色
-                btn.bg_color = C.COLOR_DARK_GREY
-                btn.hover_bg_color = C.COLOR_GREY
-            btn.draw(surface)
+        surface.fill(C.COLOR_VERY_DARK_GREY, (0, ui_bar_y, surface.get_width(), ui_bar_height))
+        # 每个按钮的外观已缓存为Surface（高亮状态在 update() 中通过 set_highlighted 设置），收集后一次批量绘制
+        surface.blits([(btn.get_surface(), btn.rect) for btn in self.building_selection_buttons], False)
 
     def _draw_turn_info_ui(self, surface: pygame.Surface) -> None:
         """在屏幕上绘制当前回合数信息。"""
         if not self.font_ui_small: return # 使用与按钮相同的字体或特定UI字体
         turn_text = f"Turn: {self.turn_system.current_turn}"
-        text_surface = self.font_ui_small.render(turn_text, True, (220, 220, 220))
+        text_surface = self._text(turn_text)
         # 显示在按钮上方或屏幕其他合适位置
         if self.next_turn_button:
             text_rect = text_surface.get_rect(midbottom=(self.next_turn_button.rect.centerx, self.next_turn_button.rect.top - 10))
@@ -628,7 +735,7 @@ class GameMainState(BaseState):
             text_rect = text_surface.get_rect(bottomright=(surface.get_width() - 20, surface.get_height() - 80))
         surface.blit(text_surface, text_rect)
 
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface) -> Optional[List[pygame.Rect]]:
         super().render(surface)
         if not self.renderer:
             surface.fill(C.COLOR_VERY_DARK_GREY)
@@ -636,17 +743,102 @@ class GameMainState(BaseState):
                 text_surf = self.font_debug.render("渲染器未初始化!", True, C.COLOR_RED)
                 surface.blit(text_surf, (50,50))
             return
+        # 除悬停格和按钮以外的所有可见状态都没有变化时，只需提交悬停格和状态变化的按钮所在的区域；全部未变时整帧跳过
+        view_key = self._view_key()
+        drawn_hover = (self.hovered_tile, self.placement_valid)
+        buttons = self._hud_buttons()
+        button_states = [self._button_state(btn) for btn in buttons]
+        view_unchanged = view_key == self._last_view_key
+        hover_unchanged = drawn_hover == self._last_drawn_hover
+        if view_unchanged and hover_unchanged and button_states == self._last_button_states:
+            return [] # 屏幕Surface上仍是上一帧的画面
+
+        if view_unchanged:
+            # 只有悬停格和/或按钮变了：只重画并提交这些区域（每个区域设置裁剪后重画一次场景，
+            # 绘制工作量与变化的面积成正比，而不是整屏）
+            dirty_rects: Optional[List[pygame.Rect]] = []
+            if not hover_unchanged:
+                # 悬停格（高亮框、放置预览）变了：旧悬停格和新悬停格两个地块大小的区域
+                dirty_rects.extend(self._tile_screen_rect(tile) for tile in (self._last_drawn_hover[0], self.hovered_tile) if tile)
+            # 按钮悬停/按下/高亮状态变了：这些按钮的区域
+            dirty_rects.extend(btn.rect for btn, state, last_state in zip(buttons, button_states, self._last_button_states)
+                               if state != last_state)
+            for dirty_rect in dirty_rects:
+                surface.set_clip(dirty_rect)
+                self._draw_scene(surface)
+            surface.set_clip(None)
+        else:
+            self._draw_scene(surface)
+            dirty_rects = None # 整屏提交
+
+        self._last_view_key = view_key
+        self._last_drawn_hover = drawn_hover
+        self._last_button_states = button_states
+        return dirty_rects
+
+    def _draw_scene(self, surface: pygame.Surface) -> None:
+        """绘制完整的一帧（地块、网格、建筑、预览和HUD）。surface 设置了裁剪区域时只会改动该区域。"""
         surface.fill((20, 20, 20)) 
         self.renderer.draw_tiles(surface, self.tiles)
         self.renderer.draw_grid(surface, self.grid_width_tiles, self.grid_height_tiles, self.tile_size)
+        self.renderer.draw_highlighted_tile(surface, self.hovered_tile)
         
         # 绘制所有建筑，并传递字体
         font_for_building_char = self.font_ui_small # 选择一个合适的已加载字体
         if not font_for_building_char:
             logger.warning("GameMainState.render: font_ui_small not loaded, building chars may not render correctly.")
             # 可以选择一个备用字体，或者让 Building.draw 内部处理 font_for_char 为 None 的情况
-        for building_obj in self.buildings:
-            building_obj.draw(surface, 
-                              font_for_building_char, # <--- 传递字体
-                              self.renderer.camera_offset_x, 
-                              self.renderer.camera_offset_y)
\ No newline at end of file
+        # 只绘制视口内的建筑：通过空间索引按可见地块范围查询，而不是遍历全部建筑
+        # 每个建筑的外观已缓存为Surface，收集后用一次 Surface.blits 批量绘制
+        camera_x = self.renderer.camera_offset_x
+        camera_y = self.renderer.camera_offset_y
+        surface.blits(
+            [(building_obj.get_sprite(font_for_building_char), (building_obj.rect.x - camera_x, building_obj.rect.y - camera_y))
+             for building_obj in self.get_buildings_in_rect(*self._visible_tile_range())],
+            False,
+        )
+        self._draw_build_preview(surface)
+
+        # HUD
+        self._draw_resource_ui(surface)
+        self._draw_turn_info_ui(surface)
+        self._draw_building_selection_ui(surface)
+        if self.next_turn_button: self.next_turn_button.draw(surface)
+
+    def _view_key(self) -> tuple:
+        """
+        汇总除悬停格和按钮状态之外、会影响画面的状态。两帧的值相等说明地图、建筑和资源/回合信息的画面都没有变化。
+        """
+        return (
+            self.renderer.camera_offset_x, self.renderer.camera_offset_y,
+            id(self.tiles), # 重新生成网格时地块列表会被替换
+            self._buildings_version, # 建筑增删或激活状态变化时版本号会增大
+            self.turn_system.current_turn,
+            self.resource_system.version, # 资源数量或上限变化时版本号会增大
+            self.build_mode, self.selected_building_type_to_build,
+            len(self._hud_buttons()), # 按钮增减时需要整屏重画
+        )
+
+    def _hud_buttons(self) -> List[Button]:
+        """HUD上的全部按钮（建筑选择按钮和结束回合按钮），在 _setup_ui_elements 中生成一次。"""
+        return self._hud_button_list
+
+    @staticmethod
+    def _button_state(btn: Button) -> tuple:
+        """按钮外观相关的状态；两帧相等说明该按钮的画面没有变化。"""
+        return (btn.text, btn.is_hovered, btn.is_pressed, btn.is_highlighted, btn.disabled)
+
+    def _visible_tile_range(self) -> Tuple[int, int, int, int]:
+        """按相机偏移和屏幕大小计算可见的地块范围 [x0, x1) × [y0, y1)，已裁剪到网格内。"""
+        renderer = self.renderer
+        tile_size = self.tile_size
+        x0 = max(0, renderer.camera_offset_x // tile_size)
+        y0 = max(0, renderer.camera_offset_y // tile_size)
+        x1 = min(self.grid_width_tiles, (renderer.camera_offset_x + renderer.screen_width) // tile_size + 1)
+        y1 = min(self.grid_height_tiles, (renderer.camera_offset_y + renderer.screen_height) // tile_size + 1)
+        return x0, y0, x1, y1
+
+    def _tile_screen_rect(self, tile: Tile) -> pygame.Rect:
+        """地块在屏幕上的矩形（已考虑相机偏移）。直接由像素坐标构造，不经过 Tile.rect 再 move 出第二个Rect。"""
+        return pygame.Rect(tile.pixel_x - self.renderer.camera_offset_x, tile.pixel_y - self.renderer.camera_offset_y,
+                           tile.tile_size, tile.tile_size)
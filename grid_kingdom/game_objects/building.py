@@ -3,19 +3,34 @@
 建筑 (Building) 类定义
 代表游戏世界中可以放置在网格上的各种建筑。
 """
+import logging
 import pygame
 from typing import Tuple, Dict, Optional, List
-from uuid import uuid4 # 用于生成唯一ID
+from itertools import count # 用于生成唯一ID
 
 from grid_kingdom.utils.logger import logger
 from grid_kingdom.systems.resource_system import ResourceType # 需要资源类型定义
 from grid_kingdom.utils import constants as C
+from grid_kingdom.ui.text_cache import render_text
 
+# 各建筑类型的底色；未列出的类型使用 C.COLOR_GREY，非激活的建筑统一使用 C.COLOR_DARK_GREY
+BUILDING_TYPE_COLORS = {
+    "mana_well": C.COLOR_BLUE,
+    "woodcutter_hut": (139, 69, 19), # SaddleBrown
+}
 class Building:
     """
     建筑的基类。
-    所有具体建筑都应继承此类。
+    所有具体建筑都应继承此类。子类如需新增实例属性，需要在自己的 __slots__ 中声明。
     """
+    __slots__ = (
+        "id", "building_type", "name", "grid_x", "grid_y", "size_tiles_x", "size_tiles_y",
+        "tile_size", "rect", "build_cost", "maintenance_cost", "produces", "production_interval",
+        "turns_since_last_production", "is_active", "_sprite", "_sprite_key",
+        "_occupied_tiles", "_label_char",
+    )
+    _next_id = count(1) # 进程内单调递增的建筑编号，比每次生成uuid4便宜得多
+
     def __init__(self, building_type: str, grid_x: int, grid_y: int, tile_size: int,
                  name: str = "未命名建筑",
                  build_cost: Optional[Dict[ResourceType, int]] = None,
@@ -36,9 +51,10 @@ class Building:
             produces (Optional[Dict[ResourceType, int]], optional): 每生产周期产出的资源。
             production_interval (int, optional): 多少个回合生产一次。默认为1（每回合）。
         """
-        self.id: str = str(uuid4()) # 每个建筑实例都有一个唯一ID
+        self.id: str = f"b{next(Building._next_id)}" # 每个建筑实例都有一个唯一ID（进程内唯一）
         self.building_type: str = building_type
         self.name: str = name
+        self._label_char: str = name[0] if name else "?" # 建筑上显示的标识字符，名称不变，只需取一次
         self.grid_x: int = grid_x
         self.grid_y: int = grid_y
         
@@ -54,6 +70,12 @@ class Building:
             self.size_tiles_x * self.tile_size,
             self.size_tiles_y * self.tile_size
         )
+        # 建筑放置后位置和尺寸不再变化，占据的地块坐标只需计算一次（元组，调用方无法修改）
+        self._occupied_tiles: Tuple[Tuple[int, int], ...] = tuple(
+            (self.grid_x + dx, self.grid_y + dy)
+            for dx in range(self.size_tiles_x)
+            for dy in range(self.size_tiles_y)
+        )
 
         self.build_cost: Dict[ResourceType, int] = build_cost if build_cost else {}
         self.maintenance_cost: Dict[ResourceType, int] = maintenance_cost if maintenance_cost else {}
@@ -62,10 +84,14 @@ class Building:
         self.turns_since_last_production: int = 0 # 追踪生产周期
         self.is_active: bool = True # 建筑是否在工作 (例如，因为缺少维护费而暂停)
 
+        # 建筑外观（底色+标识字符）预先画好的Surface，以及生成它时的 (is_active, 字体)；两者变化时才重画
+        self._sprite: Optional[pygame.Surface] = None
+        self._sprite_key: Optional[Tuple[bool, Optional[pygame.font.Font]]] = None
+
         # 插件槽等概念可以在后续阶段添加
         # self.plugin_slots: List[Optional[Plugin]] = []
 
-        logger.info(f"建筑 '{self.name}' (ID: {self.id}, 类型: {self.building_type}) 创建于网格 ({self.grid_x},{self.grid_y}).")
+        logger.debug("建筑 '%s' (ID: %s, 类型: %s) 创建于网格 (%s,%s).", self.name, self.id, self.building_type, self.grid_x, self.grid_y)
 
     def __repr__(self) -> str:
         return f"Building(id='{self.id}', type='{self.building_type}', name='{self.name}', grid=({self.grid_x},{self.grid_y}))"
@@ -81,7 +107,8 @@ class Building:
         self.turns_since_last_production += 1
         if self.turns_since_last_production >= self.production_interval:
             self.turns_since_last_production = 0 # 重置计数器
-            logger.info(f"Building '{self.name}' (ID: {self.id}) produced: {self.produces}")
+            if logger.isEnabledFor(logging.DEBUG): # 每回合每个建筑都会调用，关闭DEBUG时连日志调用本身也省掉；本回合总产出由调用方汇总后记录一次
+                logger.debug("Building '%s' (ID: %s) produced: %s", self.name, self.id, self.produces)
             return self.produces.copy() # 返回副本以防外部修改
         return None
 
@@ -98,28 +125,59 @@ class Building:
         if not self.maintenance_cost: # 没有维护费
             if not self.is_active: # 如果之前是暂停的，现在恢复
                 self.is_active = True
-                logger.info(f"Building '{self.name}' (ID: {self.id}) re-activated (no maintenance).")
+                logger.info("Building '%s' (ID: %s) re-activated (no maintenance).", self.name, self.id)
             return True
 
         if resource_system.spend_multiple_resources(self.maintenance_cost):
             if not self.is_active: # 如果之前是暂停的，现在恢复
                 self.is_active = True
-                logger.info(f"Building '{self.name}' (ID: {self.id}) maintenance paid, re-activated.")
+                logger.info("Building '%s' (ID: %s) maintenance paid, re-activated.", self.name, self.id)
             # logger.debug(f"Building '{self.name}' (ID: {self.id}) maintenance paid.")
             return True
         else:
             if self.is_active:
                 self.is_active = False
-                logger.warning(f"Building '{self.name}' (ID: {self.id}) failed to pay maintenance. Deactivated.")
+                logger.warning("Building '%s' (ID: %s) failed to pay maintenance. Deactivated.", self.name, self.id)
             return False
             
-    def get_occupied_tiles(self) -> List[Tuple[int, int]]:
-        """返回建筑占据的所有地块的网格坐标列表。"""
-        occupied = []
-        for dx in range(self.size_tiles_x):
-            for dy in range(self.size_tiles_y):
-                occupied.append((self.grid_x + dx, self.grid_y + dy))
-        return occupied
+    def get_occupied_tiles(self) -> Tuple[Tuple[int, int], ...]:
+        """返回建筑占据的所有地块的网格坐标（在初始化时预先计算好的元组）。"""
+        return self._occupied_tiles
+
+    def get_sprite(self, font_for_char: Optional[pygame.font.Font]) -> pygame.Surface:
+        """
+        返回建筑外观的缓存Surface（底色矩形+居中的标识字符）。
+        只有激活状态或字体变化时才重新生成，其余帧直接复用。
+        Args:
+            font_for_char (Optional[pygame.font.Font]): 用于绘制建筑标识字符的字体。
+        """
+        sprite_key = (self.is_active, font_for_char)
+        if self._sprite is None or self._sprite_key != sprite_key:
+            self._sprite = self._build_sprite(font_for_char)
+            self._sprite_key = sprite_key
+        return self._sprite
+
+    def _build_sprite(self, font_for_char: Optional[pygame.font.Font]) -> pygame.Surface:
+        """绘制建筑外观到一张新的Surface上。"""
+        if self.is_active:
+            color = BUILDING_TYPE_COLORS.get(self.building_type, C.COLOR_GREY) # 默认灰色
+        else:
+            color = C.COLOR_DARK_GREY
+        sprite = pygame.Surface(self.rect.size)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.fill(color)
+        if font_for_char: 
+            try:
+                char_color = C.COLOR_WHITE if self.is_active else C.COLOR_GREY
+                text_surface = render_text(font_for_char, self._label_char, char_color)
+                text_rect = text_surface.get_rect(center=sprite.get_rect().center)
+                sprite.blit(text_surface, text_rect)
+            except Exception as e:
+                logger.error("Error drawing building text char for %s with provided font: %s", self.name, e)
+        elif self.name : # 只有在有名字且没有字体时才警告，避免不必要的日志
+             logger.debug("Font not provided for drawing char on building %s, char not drawn.", self.name)
+        return sprite
 
     def draw(self, surface: pygame.Surface,
              font_for_char: Optional[pygame.font.Font], # <--- 确保这个参数存在
@@ -127,38 +185,21 @@ class Building:
              camera_offset_y: int = 0) -> None:
         """
         在指定的surface上绘制建筑的简单表示。
+        绘制大量建筑时，更高效的做法是收集 get_sprite() 的结果后用一次 Surface.blits 批量绘制。
         Args:
             surface: 目标Surface。
             font_for_char (Optional[pygame.font.Font]): 用于绘制建筑标识字符的字体。
             camera_offset_x: 相机X轴偏移。
             camera_offset_y: 相机Y轴偏移。
         """
-        color = C.COLOR_GREY # 默认灰色
-        if self.building_type == "mana_well":
-            color = C.COLOR_BLUE
-        elif self.building_type == "woodcutter_hut":
-            color = (139, 69, 19) # SaddleBrown
-        if not self.is_active:
-            color = C.COLOR_DARK_GREY
-        screen_rect = self.rect.move(-camera_offset_x, -camera_offset_y)
-        pygame.draw.rect(surface, color, screen_rect)
-        if font_for_char: 
-            try:
-                text_char = self.name[0] if self.name else "?"
-                char_color = C.COLOR_WHITE if self.is_active else C.COLOR_GREY
-                text_surface = font_for_char.render(text_char, True, char_color)
-                text_rect = text_surface.get_rect(center=screen_rect.center)
-                surface.blit(text_surface, text_rect)
-            except Exception as e:
-                logger.error(f"Error drawing building text char for {self.name} with provided font: {e}")
-        elif self.name : # 只有在有名字且没有字体时才警告，避免不必要的日志
-             logger.debug(f"Font not provided for drawing char on building {self.name}, char not drawn.")
+        surface.blit(self.get_sprite(font_for_char), (self.rect.x - camera_offset_x, self.rect.y - camera_offset_y))
 
 
 # --- 具体建筑示例 ---
 
 class ManaWell(Building):
     """一个简单的魔法井，生产法力水晶。"""
+    __slots__ = ()
     CHINESE_NAME = "魔法井"
     def __init__(self, grid_x: int, grid_y: int, tile_size: int):
         super().__init__(
@@ -175,6 +216,7 @@ class ManaWell(Building):
 
 class WoodcutterHut(Building):
     """伐木工小屋，生产木材。"""
+    __slots__ = ()
     CHINESE_NAME = "伐木小屋"
     def __init__(self, grid_x: int, grid_y: int, tile_size: int):
         super().__init__(
@@ -3,6 +3,7 @@
 地块 (Tile) 类定义
 代表游戏世界中的一个方格单元。
 """
+import logging
 from typing import Tuple, Optional
 import pygame # For Rect and potentially drawing individual tiles later
 
@@ -11,7 +12,13 @@ from grid_kingdom.utils.logger import logger
 class Tile:
     """
     代表游戏地图上的一个地块。
+    地图上每个格子都有一个实例，使用 __slots__ 省去每个实例的 __dict__。
     """
+    __slots__ = (
+        "grid_x", "grid_y", "tile_size", "tile_type", "is_occupied", "occupying_entity_id",
+        "pixel_x", "pixel_y",
+    )
+
     def __init__(self, grid_x: int, grid_y: int, tile_size: int, tile_type: str = "empty"):
         """
         初始化一个地块。
@@ -30,20 +37,27 @@ class Tile:
         self.is_occupied: bool = False # 该地块是否被建筑等占据
         self.occupying_entity_id: Optional[str] = None # 占据该地块的实体的ID
 
-        # 计算地块在屏幕上的像素位置和矩形区域
-        # 这对于渲染和碰撞检测很有用
+        # 计算地块在屏幕上的像素位置
+        # 这对于渲染和碰撞检测很有用；矩形区域见 rect 属性
         self.pixel_x = self.grid_x * self.tile_size
         self.pixel_y = self.grid_y * self.tile_size
-        self.rect = pygame.Rect(self.pixel_x, self.pixel_y, self.tile_size, self.tile_size)
 
         # logger.debug(f"Tile created at ({self.grid_x}, {self.grid_y}) of type '{self.tile_type}'")
 
+    @property
+    def rect(self) -> pygame.Rect:
+        """
+        地块的矩形区域（地图像素坐标）。
+        只有少数地方需要Rect，按需生成，不再为地图上的每个地块常驻保存一个Rect对象。
+        """
+        return pygame.Rect(self.pixel_x, self.pixel_y, self.tile_size, self.tile_size)
+
     def __repr__(self) -> str:
         return f"Tile(grid=({self.grid_x},{self.grid_y}), type='{self.tile_type}', occupied={self.is_occupied})"
 
     def set_type(self, new_type: str) -> None:
         """设置地块的新类型。"""
-        logger.info(f"Tile ({self.grid_x},{self.grid_y}) type changed from '{self.tile_type}' to '{new_type}'.")
+        logger.debug("Tile (%s,%s) type changed from '%s' to '%s'.", self.grid_x, self.grid_y, self.tile_type, new_type)
         self.tile_type = new_type
 
     def set_occupied(self, entity_id: str) -> None:
@@ -51,22 +65,25 @@ class Tile:
         if not self.is_occupied:
             self.is_occupied = True
             self.occupying_entity_id = entity_id
-            logger.info(f"Tile ({self.grid_x},{self.grid_y}) is now occupied by '{entity_id}'.")
+            if logger.isEnabledFor(logging.DEBUG): # 每个被占据的地块都会调用，关闭DEBUG时连日志调用本身也省掉
+                logger.debug("Tile (%s,%s) is now occupied by '%s'.", self.grid_x, self.grid_y, entity_id)
         else:
-            logger.warning(f"Tile ({self.grid_x},{self.grid_y}) is already occupied by '{self.occupying_entity_id}', cannot be occupied by '{entity_id}'.")
+            logger.warning("Tile (%s,%s) is already occupied by '%s', cannot be occupied by '%s'.", self.grid_x, self.grid_y, self.occupying_entity_id, entity_id)
 
     def set_vacant(self) -> None:
         """标记地块为空闲状态。"""
         if self.is_occupied:
-            logger.info(f"Tile ({self.grid_x},{self.grid_y}) previously occupied by '{self.occupying_entity_id}' is now vacant.")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tile (%s,%s) previously occupied by '%s' is now vacant.", self.grid_x, self.grid_y, self.occupying_entity_id)
             self.is_occupied = False
             self.occupying_entity_id = None
         else:
-            logger.debug(f"Tile ({self.grid_x},{self.grid_y}) is already vacant.")
+            logger.debug("Tile (%s,%s) is already vacant.", self.grid_x, self.grid_y)
 
     def draw_highlight(self, surface: pygame.Surface, color: Tuple[int, int, int], thickness: int = 2) -> None:
         """在地块边缘绘制高亮。"""
-        pygame.draw.rect(surface, color, self.rect, thickness)
+        # 直接传坐标元组，不经过 rect 属性为每次绘制分配新的Rect
+        pygame.draw.rect(surface, color, (self.pixel_x, self.pixel_y, self.tile_size, self.tile_size), thickness)
 
     # 之后可以添加更多方法，例如：
     # - get_neighbors()
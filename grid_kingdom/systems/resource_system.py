@@ -3,7 +3,8 @@
 资源系统 (ResourceSystem)
 负责管理游戏中的所有资源类型及其数量。
 """
-from typing import Dict, Union,Optional
+import logging
+from typing import Dict, List, Union,Optional
 from enum import Enum, auto
 
 from grid_kingdom.utils.logger import logger
@@ -18,7 +19,11 @@ class ResourceType(Enum):
     # ... 之后可以添加更多，如 IRON, COAL, KNOWLEDGE_POINTS 等
 
     def __str__(self):
-        return self.name.capitalize()
+        return _RESOURCE_TYPE_STR[self] # 预先算好的首字母大写名称，不必每次调用 capitalize()
+
+
+# ResourceType -> 显示用名称（如 "Wood"），在枚举定义完成后生成一次
+_RESOURCE_TYPE_STR: Dict[ResourceType, str] = {res_type: res_type.name.capitalize() for res_type in ResourceType}
 
 
 class ResourceSystem:
@@ -33,53 +38,61 @@ class ResourceSystem:
             initial_resources (Optional[Dict[ResourceType, int]]): 初始资源数量。
                                                                     如果为None，则所有资源从0开始。
         """
-        self._resources: Dict[ResourceType, int] = {}
-        self._resource_caps: Dict[ResourceType, Optional[int]] = {} # 资源上限，None表示无上限
-
-        # 初始化所有已知的资源类型，数量为0，上限为None
-        for res_type in ResourceType:
-            self._resources[res_type] = 0
-            self._resource_caps[res_type] = None # 默认为无上限
+        # 资源数量与上限按 ResourceType.value - 1 存放在定长列表中（auto() 的值是从1开始的连续整数），
+        # 下标访问比以枚举为键的字典查找更快，也省去了枚举的哈希
+        # 初始化所有已知的资源类型，数量为0，上限为None（无上限）
+        self._resources: List[int] = [0] * len(ResourceType)
+        self._resource_caps: List[Optional[int]] = [None] * len(ResourceType)
+        # 资源数量或上限每变化一次加1。界面等调用方记下上次看到的版本号，相同则说明资源没有变化，可以复用缓存
+        self._version: int = 0
 
         if initial_resources:
             for res_type, amount in initial_resources.items():
                 if isinstance(res_type, ResourceType) and isinstance(amount, int):
-                    self._resources[res_type] = max(0, amount) # 确保初始资源不为负
+                    self._resources[res_type.value - 1] = max(0, amount) # 确保初始资源不为负
                 else:
-                    logger.warning(f"Invalid initial resource entry: {res_type}, {amount}. Skipping.")
+                    logger.warning("Invalid initial resource entry: %s, %s. Skipping.", res_type, amount)
         
-        logger.info(f"ResourceSystem initialized. Current resources: {self.get_all_resources_str()}")
+        if logger.isEnabledFor(logging.INFO): # 资源字符串需要拼接，只在确实输出时才生成
+            logger.info("ResourceSystem initialized. Current resources: %s", self.get_all_resources_str())
+
+    @property
+    def version(self) -> int:
+        """资源状态的版本号：任何资源数量或上限变化后都会增大。"""
+        return self._version
 
     def get_resource_amount(self, resource_type: ResourceType) -> int:
         """获取指定资源的数量。"""
         if not isinstance(resource_type, ResourceType):
-            logger.error(f"Invalid resource type requested: {resource_type}")
+            logger.error("Invalid resource type requested: %s", resource_type)
             return 0
-        return self._resources.get(resource_type, 0)
+        return self._resources[resource_type.value - 1]
 
     def get_resource_cap(self, resource_type: ResourceType) -> Optional[int]:
         """获取指定资源的上限。"""
         if not isinstance(resource_type, ResourceType):
-            logger.error(f"Invalid resource type for cap request: {resource_type}")
+            logger.error("Invalid resource type for cap request: %s", resource_type)
             return None
-        return self._resource_caps.get(resource_type)
+        return self._resource_caps[resource_type.value - 1]
 
     def set_resource_cap(self, resource_type: ResourceType, cap: Optional[int]) -> bool:
         """设置指定资源的上限。cap为None表示无上限。"""
         if not isinstance(resource_type, ResourceType):
-            logger.error(f"Invalid resource type for setting cap: {resource_type}")
+            logger.error("Invalid resource type for setting cap: %s", resource_type)
             return False
         if cap is not None and cap < 0:
-            logger.warning(f"Cannot set negative cap for {resource_type}. Cap remains {self._resource_caps.get(resource_type)}")
+            logger.warning("Cannot set negative cap for %s. Cap remains %s", resource_type, self._resource_caps[resource_type.value - 1])
             return False
         
-        self._resource_caps[resource_type] = cap
-        logger.info(f"Resource cap for {resource_type} set to {cap}.")
+        index = resource_type.value - 1
+        self._resource_caps[index] = cap
+        self._version += 1
+        logger.info("Resource cap for %s set to %s.", resource_type, cap)
         # 如果当前资源量超过新上限，需要处理（例如，截断或允许暂时超过）
         # 目前简单截断
-        if cap is not None and self._resources[resource_type] > cap:
-            self._resources[resource_type] = cap
-            logger.info(f"Resource {resource_type} truncated to new cap {cap}.")
+        if cap is not None and self._resources[index] > cap:
+            self._resources[index] = cap
+            logger.info("Resource %s truncated to new cap %s.", resource_type, cap)
         return True
 
 
@@ -95,22 +108,57 @@ class ResourceSystem:
             bool: 是否成功增加 (例如，如果数量为负则失败)。
         """
         if not isinstance(resource_type, ResourceType):
-            logger.error(f"Invalid resource type for addition: {resource_type}")
+            logger.error("Invalid resource type for addition: %s", resource_type)
             return False
         if amount <= 0:
-            logger.warning(f"Attempted to add non-positive amount ({amount}) of {resource_type}. No change.")
+            logger.warning("Attempted to add non-positive amount (%s) of %s. No change.", amount, resource_type)
             return False
 
-        current_amount = self._resources.get(resource_type, 0)
-        cap = self._resource_caps.get(resource_type)
+        index = resource_type.value - 1
+        current_amount = self._resources[index]
+        cap = self._resource_caps[index]
 
         new_amount = current_amount + amount
+        self._version += 1
         if cap is not None and new_amount > cap:
-            self._resources[resource_type] = cap
-            logger.info(f"Added {cap - current_amount} of {resource_type} (reached cap {cap}). {new_amount - cap} was excess.")
+            self._resources[index] = cap
+            logger.debug("Added %s of %s (reached cap %s). %s was excess.", cap - current_amount, resource_type, cap, new_amount - cap)
         else:
-            self._resources[resource_type] = new_amount
-            logger.info(f"Added {amount} of {resource_type}. New total: {self._resources[resource_type]}.")
+            self._resources[index] = new_amount
+            logger.debug("Added %s of %s. New total: %s.", amount, resource_type, new_amount)
+        return True
+
+    def add_multiple_resources(self, amounts: Dict[ResourceType, int]) -> bool:
+        """
+        一次性增加多种资源（例如一回合内所有建筑的总产出）。这是一个原子操作：
+        任何一项无效时不增加任何资源。各项分别按上限截断，只记录一条汇总日志。
+
+        Args:
+            amounts (Dict[ResourceType, int]): 一个包含资源类型和增加数量（必须为正数）的字典。
+
+        Returns:
+            bool: 是否成功增加。
+        """
+        # 第一遍：校验类型与数量，同时记下每项对应的下标
+        deltas = []
+        for resource_type, amount in amounts.items():
+            if not isinstance(resource_type, ResourceType):
+                logger.error("Invalid resource type for addition: %s", resource_type)
+                return False
+            if amount <= 0:
+                logger.warning("Attempted to add non-positive amount (%s) of %s. No change.", amount, resource_type)
+                return False
+            deltas.append((resource_type.value - 1, amount))
+
+        # 第二遍：逐项入账并按上限截断
+        resources = self._resources
+        caps = self._resource_caps
+        for index, amount in deltas:
+            new_amount = resources[index] + amount
+            cap = caps[index]
+            resources[index] = new_amount if cap is None or new_amount <= cap else cap
+        self._version += 1
+        logger.debug("Added multiple resources: %s", amounts)
         return True
 
     def spend_resource(self, resource_type: ResourceType, amount: int) -> bool:
@@ -125,19 +173,21 @@ class ResourceSystem:
             bool: 如果资源足够并成功消耗则返回True，否则返回False。
         """
         if not isinstance(resource_type, ResourceType):
-            logger.error(f"Invalid resource type for spending: {resource_type}")
+            logger.error("Invalid resource type for spending: %s", resource_type)
             return False
         if amount <= 0:
-            logger.warning(f"Attempted to spend non-positive amount ({amount}) of {resource_type}. No change.")
+            logger.warning("Attempted to spend non-positive amount (%s) of %s. No change.", amount, resource_type)
             return False # 或者 True，取决于是否认为这是一个“成功”的无操作
 
-        current_amount = self._resources.get(resource_type, 0)
+        index = resource_type.value - 1
+        current_amount = self._resources[index]
         if current_amount >= amount:
-            self._resources[resource_type] = current_amount - amount
-            logger.info(f"Spent {amount} of {resource_type}. Remaining: {self._resources[resource_type]}.")
+            self._resources[index] = current_amount - amount
+            self._version += 1
+            logger.debug("Spent %s of %s. Remaining: %s.", amount, resource_type, current_amount - amount)
             return True
         else:
-            logger.warning(f"Failed to spend {amount} of {resource_type}. Only {current_amount} available.")
+            logger.warning("Failed to spend %s of %s. Only %s available.", amount, resource_type, current_amount)
             return False
 
     def has_enough_resources(self, costs: Dict[ResourceType, int]) -> bool:
@@ -152,9 +202,9 @@ class ResourceSystem:
         """
         for resource_type, required_amount in costs.items():
             if not isinstance(resource_type, ResourceType):
-                logger.error(f"Invalid resource type in costs: {resource_type}")
+                logger.error("Invalid resource type in costs: %s", resource_type)
                 return False
-            if self.get_resource_amount(resource_type) < required_amount:
+            if self._resources[resource_type.value - 1] < required_amount:
                 return False
         return True
 
@@ -168,26 +218,34 @@ class ResourceSystem:
         Returns:
             bool: 如果所有资源都成功消耗则返回True，否则返回False。
         """
-        if not self.has_enough_resources(costs):
-            logger.warning(f"Not enough resources to cover costs: {costs}. Current: {self.get_all_resources_str()}")
-            return False
-
+        # 第一遍：校验类型与数量并检查是否足够，同时记下每项对应的下标；任何一项不满足都不做任何扣除
+        resources = self._resources
+        deltas = []
         for resource_type, amount_to_spend in costs.items():
-            # 我们已经检查过 has_enough_resources，所以这里直接减去
-            # 但为了严谨，spend_resource内部还是会做检查
-            if not self.spend_resource(resource_type, amount_to_spend):
-                # 理论上不应该发生，因为上面检查过了
-                # 如果发生了，说明逻辑有严重问题，可能需要回滚之前的消耗 (如果不是原子性的)
-                # 对于这个简单版本，我们假设如果has_enough_resources通过，则单个spend_resource也会通过
-                logger.critical(f"CRITICAL: spend_multiple_resources inconsistency! Failed to spend {resource_type} after check. Costs: {costs}")
-                # 此处可以添加回滚逻辑，将已扣除的资源加回去
-                return False 
-        logger.info(f"Successfully spent multiple resources for costs: {costs}")
+            if not isinstance(resource_type, ResourceType):
+                logger.error("Invalid resource type in costs: %s", resource_type)
+                return False
+            if amount_to_spend <= 0:
+                logger.warning("Attempted to spend non-positive amount (%s) of %s. No change.", amount_to_spend, resource_type)
+                return False
+            index = resource_type.value - 1
+            if resources[index] < amount_to_spend:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Not enough resources to cover costs: %s. Current: %s", costs, self.get_all_resources_str())
+                return False
+            deltas.append((index, amount_to_spend))
+
+        # 第二遍：全部足够，直接扣除（无需再次检查，也不逐项记录日志）
+        for index, amount_to_spend in deltas:
+            resources[index] -= amount_to_spend
+        self._version += 1
+        if logger.isEnabledFor(logging.DEBUG): # 每回合每个建筑支付维护费都会走到这里
+            logger.debug("Successfully spent multiple resources for costs: %s", costs)
         return True
 
     def get_all_resources_str(self) -> str:
         """返回所有资源及其数量的字符串表示，用于日志或调试。"""
-        return ", ".join(f"{res_type.name}: {amount}" for res_type, amount in self._resources.items())
+        return ", ".join(f"{res_type.name}: {amount}" for res_type, amount in zip(ResourceType, self._resources))
 
     def __str__(self) -> str:
         return f"ResourceSystem({self.get_all_resources_str()})"
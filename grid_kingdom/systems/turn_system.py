@@ -3,7 +3,8 @@
 回合系统 (TurnSystem)
 负责管理游戏的回合数以及回合结束时的结算逻辑。
 """
-from typing import Callable, List
+import logging
+from typing import Callable, List, Tuple
 from grid_kingdom.utils.logger import logger
 from grid_kingdom.systems.resource_system import ResourceSystem, ResourceType # 需要资源系统进行全局消耗
 
@@ -11,6 +12,11 @@ class TurnSystem:
     """
     管理游戏的回合。
     """
+    __slots__ = ('current_turn', 'resource_system', '_on_turn_end_callbacks', '_on_new_turn_start_callbacks',
+                 '_turn_end_dispatch', '_new_turn_start_dispatch')
+
+    GLOBAL_UPKEEP = (ResourceType.FOOD, 1) # 每回合的全局消耗：(资源类型, 数量)
+
     def __init__(self, resource_system: ResourceSystem, initial_turn: int = 1):
         """
         初始化回合系统。
@@ -22,60 +28,87 @@ class TurnSystem:
         self.current_turn: int = max(1, initial_turn)
         self.resource_system = resource_system # 持有资源系统的引用
 
-        # 回调列表，用于在回合结束时执行特定动作（如建筑生产、事件触发等）
+        # 回调表，用于在回合结束时执行特定动作（如建筑生产、事件触发等）
         # 每个回调函数应该不接受参数或接受 TurnSystem 实例作为参数
-        self._on_turn_end_callbacks: List[Callable] = []
-        self._on_new_turn_start_callbacks: List[Callable] = [] # 新增：回合开始时的回调
-
-        logger.info(f"TurnSystem initialized. Current turn: {self.current_turn}.")
+        # 按注册顺序保存 (回调, 日志用名称)，名称在注册时解析一次
+        # 查重按相等比较而不是哈希，不可哈希的可调用对象也能注册；注册很少发生，线性查找无妨
+        self._on_turn_end_callbacks: List[Tuple[Callable, str]] = []
+        self._on_new_turn_start_callbacks: List[Tuple[Callable, str]] = [] # 新增：回合开始时的回调
+        # 每次推进回合时实际遍历的 (回调, 名称) 元组，只在注册/取消注册时重建
+        self._turn_end_dispatch: Tuple[Tuple[Callable, str], ...] = ()
+        self._new_turn_start_dispatch: Tuple[Tuple[Callable, str], ...] = ()
+
+        logger.info("TurnSystem initialized. Current turn: %s.", self.current_turn)
+
+    @staticmethod
+    def _callback_name(callback: Callable) -> str:
+        """回调在日志中显示的名称。"""
+        return getattr(callback, '__name__', None) or str(callback)
+
+    @staticmethod
+    def _find_callback(callbacks: List[Tuple[Callable, str]], callback: Callable) -> int:
+        """返回回调在 (回调, 名称) 列表中的下标（按相等比较），不存在时返回 -1。"""
+        for index, (registered, _) in enumerate(callbacks):
+            if registered == callback:
+                return index
+        return -1
 
     def register_on_turn_end_callback(self, callback: Callable) -> None:
         """注册一个在回合结束时调用的回调函数。"""
-        if callback not in self._on_turn_end_callbacks:
-            self._on_turn_end_callbacks.append(callback)
-            logger.debug(f"Callback {callback.__name__ if hasattr(callback, '__name__') else str(callback)} registered for turn end.")
+        if self._find_callback(self._on_turn_end_callbacks, callback) < 0:
+            name = self._callback_name(callback)
+            self._on_turn_end_callbacks.append((callback, name))
+            self._turn_end_dispatch = tuple(self._on_turn_end_callbacks)
+            logger.debug("Callback %s registered for turn end.", name)
 
     def unregister_on_turn_end_callback(self, callback: Callable) -> None:
         """取消注册回合结束回调。"""
-        if callback in self._on_turn_end_callbacks:
-            self._on_turn_end_callbacks.remove(callback)
-            logger.debug(f"Callback {callback.__name__ if hasattr(callback, '__name__') else str(callback)} unregistered from turn end.")
+        index = self._find_callback(self._on_turn_end_callbacks, callback)
+        if index >= 0:
+            _, name = self._on_turn_end_callbacks.pop(index)
+            self._turn_end_dispatch = tuple(self._on_turn_end_callbacks)
+            logger.debug("Callback %s unregistered from turn end.", name)
 
     def register_on_new_turn_start_callback(self, callback: Callable) -> None:
         """注册一个在新回合开始时调用的回调函数。"""
-        if callback not in self._on_new_turn_start_callbacks:
-            self._on_new_turn_start_callbacks.append(callback)
-            logger.debug(f"Callback {callback.__name__ if hasattr(callback, '__name__') else str(callback)} registered for new turn start.")
+        if self._find_callback(self._on_new_turn_start_callbacks, callback) < 0:
+            name = self._callback_name(callback)
+            self._on_new_turn_start_callbacks.append((callback, name))
+            self._new_turn_start_dispatch = tuple(self._on_new_turn_start_callbacks)
+            logger.debug("Callback %s registered for new turn start.", name)
             
     def unregister_on_new_turn_start_callback(self, callback: Callable) -> None:
         """取消注册新回合开始回调。"""
-        if callback in self._on_new_turn_start_callbacks:
-            self._on_new_turn_start_callbacks.remove(callback)
-            logger.debug(f"Callback {callback.__name__ if hasattr(callback, '__name__') else str(callback)} unregistered from new turn start.")
+        index = self._find_callback(self._on_new_turn_start_callbacks, callback)
+        if index >= 0:
+            _, name = self._on_new_turn_start_callbacks.pop(index)
+            self._new_turn_start_dispatch = tuple(self._on_new_turn_start_callbacks)
+            logger.debug("Callback %s unregistered from new turn start.", name)
 
 
-    def _execute_callbacks(self, callback_list: List[Callable]) -> None:
-        """执行指定列表中的所有回调函数。"""
-        for callback in callback_list:
+    def _execute_callbacks(self, dispatch: Tuple[Tuple[Callable, str], ...]) -> None:
+        """执行指定的 (回调, 名称) 元组中的所有回调函数（按注册顺序）。"""
+        # 元组在注册时生成，不可变：回调执行过程中注册/取消注册其他回调不会影响本轮遍历
+        for callback, name in dispatch:
             try:
                 # 考虑回调函数可能需要 TurnSystem 或 ResourceSystem 实例
                 # 或者干脆不传参数，让回调函数自己从全局或其所属对象获取所需数据
                 callback() 
             except Exception as e:
-                logger.error(f"Error executing callback {callback.__name__ if hasattr(callback, '__name__') else str(callback)}: {e}", exc_info=True)
+                logger.error("Error executing callback %s: %s", name, e, exc_info=True)
 
     def _process_global_turn_effects(self) -> None:
         """处理全局的回合效果，例如全局资源消耗。"""
-        logger.info(f"Processing global effects for end of turn {self.current_turn}.")
+        logger.debug("Processing global effects for end of turn %s.", self.current_turn)
         
         # 示例：每回合固定消耗1单位的食物 (如果食物资源存在)
-        cost_per_turn = {ResourceType.FOOD: 1} 
-        # 你也可以让这个消耗值是动态的，比如基于王国人口等
-        
-        if self.resource_system.spend_multiple_resources(cost_per_turn):
-            logger.info(f"Global upkeep paid for turn {self.current_turn}: {cost_per_turn}")
+        # 消耗只有一种资源且固定不变，直接走单资源消耗，不必每回合构造字典再逐项遍历
+        # 你也可以让这个消耗值是动态的，比如基于王国人口等（那时再改用 spend_multiple_resources）
+        upkeep_type, upkeep_amount = self.GLOBAL_UPKEEP
+        if self.resource_system.spend_resource(upkeep_type, upkeep_amount):
+            logger.debug("Global upkeep paid for turn %s: %s %s", self.current_turn, upkeep_amount, upkeep_type)
         else:
-            logger.warning(f"Failed to pay global upkeep for turn {self.current_turn}. Cost: {cost_per_turn}. Resources might be critically low.")
+            logger.warning("Failed to pay global upkeep for turn %s. Cost: %s %s. Resources might be critically low.", self.current_turn, upkeep_amount, upkeep_type)
             # 这里可以触发一些负面事件或状态，比如饥饿、士气下降等
 
     def advance_turn(self) -> None:
@@ -83,23 +116,24 @@ class TurnSystem:
         推进到下一回合。
         这将触发回合结束回调、全局回合效果，然后增加回合数并触发新回合开始回调。
         """
-        logger.info(f"--- Advancing from Turn {self.current_turn} ---")
+        logger.debug("--- Advancing from Turn %s ---", self.current_turn)
 
         # 1. 执行回合结束时的回调 (例如建筑生产、维护费支付 - 这些逻辑现在在GameMainState._process_next_turn_logic)
         #    我们应该将 GameMainState._process_next_turn_logic 注册到这里
         logger.debug("Executing on_turn_end_callbacks...")
-        self._execute_callbacks(self._on_turn_end_callbacks)
+        self._execute_callbacks(self._turn_end_dispatch)
 
         # 2. 处理全局回合效果 (例如，全局资源消耗)
         self._process_global_turn_effects()
 
         # 3. 增加回合数
         self.current_turn += 1
-        logger.info(f"--- New Turn Started: {self.current_turn} ---")
+        logger.info("--- New Turn Started: %s ---", self.current_turn)
 
         # 4. 执行新回合开始时的回调 (例如，刷新手牌、触发新事件)
         logger.debug("Executing on_new_turn_start_callbacks...")
-        self._execute_callbacks(self._on_new_turn_start_callbacks)
+        self._execute_callbacks(self._new_turn_start_dispatch)
         
-        logger.info(f"Advanced to turn {self.current_turn}. Current resources: {self.resource_system.get_all_resources_str()}")
+        if logger.isEnabledFor(logging.INFO): # 资源字符串需要拼接，只在确实输出时才生成
+            logger.info("Advanced to turn %s. Current resources: %s", self.current_turn, self.resource_system.get_all_resources_str())
 
@@ -2,15 +2,24 @@
 """
 通用按钮 (Button) UI组件
 """
+import logging
 import pygame
-from typing import Callable, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from grid_kingdom.utils.logger import logger
+from grid_kingdom.ui.text_cache import render_text
 
 class Button:
     """
     一个简单的可点击按钮组件。
     """
+    __slots__ = (
+        "rect", "text", "font", "on_click_callback", "text_color", "bg_color", "hover_bg_color",
+        "disabled_bg_color", "border_color", "border_width", "is_hovered", "is_pressed", "disabled",
+        "highlight_bg_color", "is_highlighted", "data", "_event_handlers",
+        "_text_surface", "_state_surfaces",
+    )
+
     def __init__(self,
                  rect: pygame.Rect,
                  text: str,
@@ -22,7 +31,9 @@ class Button:
                  disabled_bg_color: Optional[Tuple[int, int, int]] = (50, 50, 50),
                  border_color: Optional[Tuple[int, int, int]] = (150, 150, 150),
                  border_width: int = 1,
-                 disabled: bool = False):
+                 disabled: bool = False,
+                 highlight_bg_color: Optional[Tuple[int, int, int]] = None,
+                 data: Any = None):
         """
         初始化按钮。
 
@@ -38,6 +49,8 @@ class Button:
             border_color (Optional[Tuple[int, int, int]]): 边框颜色。
             border_width (int): 边框宽度。
             disabled (bool): 按钮是否禁用。
+            highlight_bg_color (Optional[Tuple[int, int, int]]): 高亮（选中）时的背景颜色，优先于悬停色。
+            data (Any): 调用方附加在按钮上的任意数据（例如按钮对应的建筑类）。
         """
         self.rect = rect
         self.text = text
@@ -52,20 +65,30 @@ class Button:
         self.is_hovered: bool = False
         self.is_pressed: bool = False # 可选：用于按下时的视觉效果
         self.disabled: bool = disabled
+        self.highlight_bg_color = highlight_bg_color
+        self.is_highlighted: bool = False
+        self.data = data
+        # 事件处理表：每个事件只需一次字典查找，而不是逐个比较 event.type
+        self._event_handlers = {
+            pygame.MOUSEMOTION: self._on_mouse_motion,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_button_down,
+            pygame.MOUSEBUTTONUP: self._on_mouse_button_up,
+        }
 
         self._text_surface: Optional[pygame.Surface] = None
-        self._text_rect: Optional[pygame.Rect] = None
+        # 各状态 (normal/hover/disabled/highlighted) 的按钮外观，在文本渲染后一次性生成；切换状态只需换一张Surface
+        self._state_surfaces: Dict[str, pygame.Surface] = {}
         self._render_text()
 
     def _render_text(self) -> None:
-        """预渲染文本，以提高性能。"""
+        """预渲染文本，以提高性能。文本变化后各状态的按钮外观也随之重新生成。"""
         try:
-            self._text_surface = self.font.render(self.text, True, self.text_color)
-            self._text_rect = self._text_surface.get_rect(center=self.rect.center)
+            # 相同 (字体, 文本, 颜色) 的按钮共享同一张已转换为屏幕像素格式的文本Surface
+            self._text_surface = render_text(self.font, self.text, tuple(self.text_color))
         except Exception as e:
-            logger.error(f"Error rendering button text '{self.text}': {e}")
+            logger.error("Error rendering button text '%s': %s", self.text, e)
             self._text_surface = None # 确保出错时不会使用旧的surface
-            self._text_rect = None
+        self._rebuild_state_surfaces()
 
     def set_text(self, new_text: str) -> None:
         """更新按钮文本并重新渲染。"""
@@ -77,7 +100,11 @@ class Button:
         """设置按钮的禁用状态。"""
         if self.disabled != disabled_status:
             self.disabled = disabled_status
-            logger.debug(f"Button '{self.text}' disabled status set to {self.disabled}")
+            logger.debug("Button '%s' disabled status set to %s", self.text, self.disabled)
+
+    def set_highlighted(self, highlighted: bool) -> None:
+        """设置按钮的高亮（选中）状态。"""
+        self.is_highlighted = highlighted
 
     def handle_event(self, event: pygame.event.Event) -> None:
         """处理输入事件，检查按钮是否被点击。"""
@@ -86,44 +113,78 @@ class Button:
             self.is_pressed = False
             return
 
-        if event.type == pygame.MOUSEMOTION:
-            self.is_hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1 and self.is_hovered:
-                self.is_pressed = True
-                logger.debug(f"Button '{self.text}' pressed.")
-        elif event.type == pygame.MOUSEBUTTONUP:
-            if event.button == 1 and self.is_pressed and self.is_hovered: # 确保在按钮内释放
-                logger.info(f"Button '{self.text}' clicked.")
-                if self.on_click_callback:
-                    try:
-                        self.on_click_callback()
-                    except Exception as e:
-                        logger.error(f"Error in button '{self.text}' on_click callback: {e}", exc_info=True)
-            self.is_pressed = False # 无论如何都重置按下状态
+        # 按事件类型查表分派，按钮不关心的事件类型直接跳过
+        handler = self._event_handlers.get(event.type)
+        if handler is not None:
+            handler(event)
 
-    def draw(self, surface: pygame.Surface) -> None:
-        """在指定的surface上绘制按钮。"""
-        current_bg_color = self.bg_color
+    def _on_mouse_motion(self, event: pygame.event.Event) -> None:
+        self.is_hovered = self.rect.collidepoint(event.pos)
+
+    def _on_mouse_button_down(self, event: pygame.event.Event) -> None:
+        if event.button == 1 and self.is_hovered:
+            self.is_pressed = True
+            if logger.isEnabledFor(logging.DEBUG): # 输入事件路径上，关闭DEBUG时连日志调用本身也省掉
+                logger.debug("Button '%s' pressed.", self.text)
+
+    def _on_mouse_button_up(self, event: pygame.event.Event) -> None:
+        if event.button == 1 and self.is_pressed and self.is_hovered: # 确保在按钮内释放
+            logger.info("Button '%s' clicked.", self.text)
+            if self.on_click_callback:
+                try:
+                    self.on_click_callback()
+                except Exception as e:
+                    logger.error("Error in button '%s' on_click callback: %s", self.text, e, exc_info=True)
+        self.is_pressed = False # 无论如何都重置按下状态
+
+    def _rebuild_state_surfaces(self) -> None:
+        """为每种状态生成一张按钮外观Surface（背景+边框+文本）。"""
+        self._state_surfaces = {
+            "normal": self._build_surface(self.bg_color),
+            "hover": self._build_surface(self.hover_bg_color),
+            "disabled": self._build_surface(self.disabled_bg_color),
+        }
+        if self.highlight_bg_color:
+            self._state_surfaces["highlighted"] = self._build_surface(self.highlight_bg_color)
+
+    def _current_state(self) -> str:
+        """根据禁用/高亮/悬停/按下状态返回当前外观对应的键。"""
         if self.disabled:
-            current_bg_color = self.disabled_bg_color
-        elif self.is_pressed and self.is_hovered: # 按下时的视觉效果可以和悬停一样或更深
-            current_bg_color = self.hover_bg_color # 或者一个更深的颜色
-        elif self.is_hovered:
-            current_bg_color = self.hover_bg_color
-        
-        pygame.draw.rect(surface, current_bg_color, self.rect)
+            return "disabled"
+        if self.is_highlighted and self.highlight_bg_color:
+            return "highlighted"
+        if self.is_hovered: # 按下时的视觉效果和悬停一样（按下必然处于悬停状态）
+            return "hover"
+        return "normal"
+
+    def get_surface(self) -> pygame.Surface:
+        """返回按钮当前状态对应的预生成外观Surface。"""
+        return self._state_surfaces[self._current_state()]
+
+    def _build_surface(self, bg_color: Tuple[int, int, int]) -> pygame.Surface:
+        """把按钮外观绘制到一张与按钮同尺寸的新Surface上。"""
+        button_surface = pygame.Surface(self.rect.size)
+        if pygame.display.get_surface() is not None:
+            button_surface = button_surface.convert()
+        button_surface.fill(bg_color)
+        local_rect = button_surface.get_rect()
 
         if self.border_color and self.border_width > 0:
-            pygame.draw.rect(surface, self.border_color, self.rect, self.border_width)
+            pygame.draw.rect(button_surface, self.border_color, local_rect, self.border_width)
 
-        if self._text_surface and self._text_rect:
-            surface.blit(self._text_surface, self._text_rect)
-        elif self.text: # 如果文本surface渲染失败，尝试动态渲染一次（性能较低）
+        text_surface = self._text_surface
+        if text_surface is None and self.text: # 如果文本surface预渲染失败，这里再尝试渲染一次
             try:
-                fallback_text_surface = self.font.render(self.text, True, self.text_color)
-                fallback_text_rect = fallback_text_surface.get_rect(center=self.rect.center)
-                surface.blit(fallback_text_surface, fallback_text_rect)
+                text_surface = self.font.render(self.text, True, self.text_color)
             except Exception as e:
-                logger.error(f"Fallback text rendering failed for button '{self.text}': {e}")
+                logger.error("Fallback text rendering failed for button '%s': %s", self.text, e)
+        if text_surface is not None:
+            button_surface.blit(text_surface, text_surface.get_rect(center=local_rect.center))
+        return button_surface
 
+    def draw(self, surface: pygame.Surface) -> None:
+        """
+        在指定的surface上绘制按钮。
+        绘制一组按钮时，更高效的做法是收集 get_surface() 的结果后用一次 Surface.blits 批量绘制。
+        """
+        surface.blit(self.get_surface(), self.rect)
@@ -4,7 +4,7 @@
 负责绘制游戏世界的所有可见元素，如网格、地块、建筑、UI等。
 """
 import pygame
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 from grid_kingdom.utils.logger import logger
 from grid_kingdom.game_objects.tile import Tile # 导入 Tile 类
@@ -14,10 +14,23 @@ GRID_LINE_COLOR = (50, 50, 50)  # 网格线颜色 (深灰)
 TILE_DEFAULT_COLOR = (100, 100, 100) # 地块默认颜色 (中灰)
 TILE_HIGHLIGHT_COLOR = (255, 255, 0) # 鼠标悬停地块高亮颜色 (黄色)
 
+# 各地块类型在图集中的颜色；未列出的类型使用 TILE_DEFAULT_COLOR
+TILE_TYPE_COLORS = {
+    "grass": (0, 150, 0), # 绿色
+    "water": (0, 0, 150), # 蓝色
+}
+
 class Renderer:
     """
     游戏渲染器类。
     """
+    __slots__ = (
+        "screen_width", "screen_height", "camera_offset_x", "camera_offset_y",
+        "_tile_atlas", "_tile_atlas_size", "_tile_subsurfaces", "_default_tile_subsurface",
+        "_tile_layer", "_tile_layer_source", "_tile_layer_dirty",
+        "_grid_surface", "_grid_surface_key",
+    )
+
     def __init__(self, screen_width: int, screen_height: int):
         self.screen_width = screen_width
         self.screen_height = screen_height
@@ -26,6 +39,44 @@ class Renderer:
         self.camera_offset_x = 0
         self.camera_offset_y = 0
 
+        # 地块图集：所有地块类型的图像横向排列在同一张Surface上，每种类型对应一个子Surface
+        # 目前没有美术资源，图集按颜色生成；以后换成 pygame.image.load(...) 加载的精灵表即可
+        self._tile_atlas: Optional[pygame.Surface] = None
+        self._tile_atlas_size: int = 0
+        self._tile_subsurfaces: Dict[str, pygame.Surface] = {}
+        self._default_tile_subsurface: Optional[pygame.Surface] = None
+
+        # 地块层：整张地图的地块预先画到一张Surface上，之后每帧只需一次blit
+        # 地块列表被替换（重新生成网格）或调用 invalidate_tile_layer() 后才重新生成
+        self._tile_layer: Optional[pygame.Surface] = None
+        self._tile_layer_source: Optional[List[Tile]] = None
+        self._tile_layer_dirty: bool = True
+
+        # 网格线层：所有网格线预先画到一张透明Surface上，之后每帧只需一次blit
+        # 网格尺寸或地块边长变化时才重新生成
+        self._grid_surface: Optional[pygame.Surface] = None
+        self._grid_surface_key: Optional[Tuple[int, int, int]] = None
+
+    def _build_tile_atlas(self, tile_size: int) -> None:
+        """按地块边长生成地块图集，并为每种地块类型切出子Surface（共享图集的像素，不复制）。"""
+        tile_types = list(TILE_TYPE_COLORS)
+        atlas = pygame.Surface((tile_size * (len(tile_types) + 1), tile_size))
+        # 第0格为默认地块，之后依次为 TILE_TYPE_COLORS 中的类型
+        atlas.fill(TILE_DEFAULT_COLOR, (0, 0, tile_size, tile_size))
+        for i, tile_type in enumerate(tile_types, start=1):
+            atlas.fill(TILE_TYPE_COLORS[tile_type], (i * tile_size, 0, tile_size, tile_size))
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert() # 与屏幕像素格式一致，blit时无需逐像素转换
+
+        self._tile_atlas = atlas
+        self._tile_atlas_size = tile_size
+        self._default_tile_subsurface = atlas.subsurface((0, 0, tile_size, tile_size))
+        self._tile_subsurfaces = {
+            tile_type: atlas.subsurface((i * tile_size, 0, tile_size, tile_size))
+            for i, tile_type in enumerate(tile_types, start=1)
+        }
+        logger.debug("Tile atlas built: %s tile images of %spx.", len(tile_types) + 1, tile_size)
+
     def draw_grid(self, surface: pygame.Surface, grid_size_w: int, grid_size_h: int, tile_size: int) -> None:
         """
         在指定的surface上绘制网格线。
@@ -36,48 +87,96 @@ class Renderer:
             grid_size_h (int): 网格的高度（多少个地块）。
             tile_size (int): 每个地块的边长（像素）。
         """
+        grid_key = (grid_size_w, grid_size_h, tile_size)
+        if self._grid_surface is None or self._grid_surface_key != grid_key:
+            self._rebuild_grid_surface(grid_size_w, grid_size_h, tile_size)
+            self._grid_surface_key = grid_key
+
+        # 考虑相机偏移
+        surface.blit(self._grid_surface, (-self.camera_offset_x, -self.camera_offset_y))
+
+    def _rebuild_grid_surface(self, grid_size_w: int, grid_size_h: int, tile_size: int) -> None:
+        """把全部网格线画到一张透明Surface上（最右、最下的线落在最后一个像素上，因此宽高各加1）。"""
+        grid_pixel_w = grid_size_w * tile_size
+        grid_pixel_h = grid_size_h * tile_size
+        grid_surface = pygame.Surface((grid_pixel_w + 1, grid_pixel_h + 1), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            grid_surface = grid_surface.convert_alpha()
+
         # 绘制垂直线
         for x in range(grid_size_w + 1):
-            start_pos = (x * tile_size - self.camera_offset_x, 0 - self.camera_offset_y)
-            end_pos = (x * tile_size - self.camera_offset_x, grid_size_h * tile_size - self.camera_offset_y)
-            pygame.draw.line(surface, GRID_LINE_COLOR, start_pos, end_pos)
+            pygame.draw.line(grid_surface, GRID_LINE_COLOR, (x * tile_size, 0), (x * tile_size, grid_pixel_h))
 
         # 绘制水平线
         for y in range(grid_size_h + 1):
-            start_pos = (0 - self.camera_offset_x, y * tile_size - self.camera_offset_y)
-            end_pos = (grid_size_w * tile_size - self.camera_offset_x, y * tile_size - self.camera_offset_y)
-            pygame.draw.line(surface, GRID_LINE_COLOR, start_pos, end_pos)
+            pygame.draw.line(grid_surface, GRID_LINE_COLOR, (0, y * tile_size), (grid_pixel_w, y * tile_size))
+
+        self._grid_surface = grid_surface
+        logger.debug("Grid line surface rebuilt: %sx%s tiles of %spx.", grid_size_w, grid_size_h, tile_size)
 
-    def draw_tiles(self, surface: pygame.Surface, tiles: List[List[Tile]]) -> None:
+    def invalidate_tile_layer(self) -> None:
+        """标记地块层需要重新生成（地块类型发生变化后调用）。"""
+        self._tile_layer_dirty = True
+
+    def invalidate_tile(self, tile: Tile) -> None:
+        """
+        单个地块类型变化后调用：只把该地块重画到地块层上，而不是重建整层。
+        地块层尚未生成或已被标记为整体失效时无需处理，下次绘制时会整体重建。
+        """
+        if self._tile_layer is None or self._tile_layer_dirty:
+            return
+        image = self._tile_subsurfaces.get(tile.tile_type, self._default_tile_subsurface)
+        self._tile_layer.blit(image, (tile.pixel_x, tile.pixel_y))
+
+    def _rebuild_tile_layer(self, tiles: List[Tile]) -> None:
+        """
+        把所有地块画到地块层上。每个地块从地块图集中取对应类型的子Surface，
+        然后用一次 Surface.blits 调用批量绘制（循环在C层完成）。
         """
-        绘制所有地块。目前只是简单填充颜色。
+        tile_size = tiles[0].tile_size
+        if self._tile_atlas is None or self._tile_atlas_size != tile_size:
+            self._build_tile_atlas(tile_size)
+
+        last_tile = tiles[-1]
+        layer_size = ((last_tile.grid_x + 1) * tile_size, (last_tile.grid_y + 1) * tile_size)
+        if self._tile_layer is None or self._tile_layer.get_size() != layer_size:
+            self._tile_layer = pygame.Surface(layer_size)
+            if pygame.display.get_surface() is not None:
+                self._tile_layer = self._tile_layer.convert()
+
+        get_image = self._tile_subsurfaces.get
+        default_image = self._default_tile_subsurface
+        self._tile_layer.blits(
+            [(get_image(tile_obj.tile_type, default_image), (tile_obj.pixel_x, tile_obj.pixel_y))
+             for tile_obj in tiles],
+            False, # 不需要返回每次blit的矩形
+        )
+        self._tile_layer_source = tiles
+        self._tile_layer_dirty = False
+        logger.debug("Tile layer rebuilt: %s tiles, %sx%spx.", len(tiles), layer_size[0], layer_size[1])
+
+    def draw_tiles(self, surface: pygame.Surface, tiles: List[Tile]) -> None:
+        """
+        绘制所有地块。地块预先缓存在地块层中，这里只按相机偏移把整层blit一次。
 
         Args:
             surface (pygame.Surface): 目标Surface。
-            tiles (List[List[Tile]]): 二维列表，包含所有Tile对象。
+            tiles (List[Tile]): 按行优先顺序存放的一维地块列表。
         """
-        if not tiles or not tiles[0]:
+        if not tiles:
             return
 
-        for row in tiles:
-            for tile_obj in row:
-                # 根据地块类型选择颜色 (简单示例)
-                color = TILE_DEFAULT_COLOR
-                if tile_obj.tile_type == "grass":
-                    color = (0, 150, 0) # 绿色
-                elif tile_obj.tile_type == "water":
-                    color = (0, 0, 150) # 蓝色
-                
-                # 考虑相机偏移
-                tile_rect_on_screen = tile_obj.rect.move(-self.camera_offset_x, -self.camera_offset_y)
-                pygame.draw.rect(surface, color, tile_rect_on_screen)
-                # 未来：在这里绘制地块的纹理而不是纯色
+        if self._tile_layer_dirty or tiles is not self._tile_layer_source:
+            self._rebuild_tile_layer(tiles)
+
+        # 考虑相机偏移
+        surface.blit(self._tile_layer, (-self.camera_offset_x, -self.camera_offset_y))
 
     def draw_highlighted_tile(self, surface: pygame.Surface, tile: Optional[Tile]) -> None:
         """如果存在高亮地块，则绘制其高亮边框。"""
         if tile:
-            # 考虑相机偏移
-            highlight_rect = tile.rect.move(-self.camera_offset_x, -self.camera_offset_y)
+            # 考虑相机偏移（直接传坐标元组，不为每次绘制分配新的Rect）
+            highlight_rect = (tile.pixel_x - self.camera_offset_x, tile.pixel_y - self.camera_offset_y, tile.tile_size, tile.tile_size)
             pygame.draw.rect(surface, TILE_HIGHLIGHT_COLOR, highlight_rect, 2) # 2是边框厚度
 
     # 未来可以添加:
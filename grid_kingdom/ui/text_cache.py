@@ -0,0 +1,37 @@
+# /grid_kingdom/ui/text_cache.py
+"""
+文本渲染缓存
+font.render 的结果只取决于 (字体, 文本, 颜色)，对相同参数直接复用已渲染的Surface，
+避免每帧重复光栅化字形。
+"""
+from functools import lru_cache
+from typing import Tuple
+
+import pygame
+
+from grid_kingdom.utils.logger import logger
+
+TEXT_CACHE_SIZE = 512 # 最多缓存的文本Surface数量，超出后淘汰最久未使用的条目
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(font: pygame.font.Font, text: str, color: Tuple[int, ...]) -> pygame.Surface:
+    """
+    渲染抗锯齿文本并缓存结果。返回的Surface会被多处共享，调用方不要在上面绘制。
+
+    Args:
+        font (pygame.font.Font): 字体（按对象本身作为缓存键，字体在状态存续期间不会变化）。
+        text (str): 要渲染的文本。
+        color (Tuple[int, ...]): 文本颜色，必须是元组（需要可哈希）。
+    """
+    text_surface = font.render(text, True, color)
+    # 缓存的文本会被反复blit，先转换成屏幕的像素格式，blit时不再逐像素转换
+    if pygame.display.get_surface() is not None:
+        text_surface = text_surface.convert_alpha()
+    return text_surface
+
+
+def clear_text_cache() -> None:
+    """清空文本缓存（切换状态时调用，旧状态的字体及其文本不再需要）。"""
+    logger.debug("Text render cache cleared: %s", render_text.cache_info())
+    render_text.cache_clear()
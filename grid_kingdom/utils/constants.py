@@ -18,6 +18,8 @@ FALLBACK_FONT_NAME = "arial" # 系统备用字体 (可能无中文)
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
+FIXED_UPDATE_HZ = 60 # 游戏逻辑的固定更新频率，与渲染帧率解耦
+MAX_UPDATE_STEPS_PER_FRAME = 5 # 单帧最多追赶的逻辑步数，避免卡顿后陷入越追越慢的循环
 WINDOW_TITLE = "方格王国 - 开发版" # 中文标题
 
 # --- 颜色 ---
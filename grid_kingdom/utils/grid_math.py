@@ -0,0 +1,35 @@
+# file/grid_kingdom/utils/grid_math.py
+"""
+网格坐标数学
+屏幕/世界像素坐标与网格坐标之间的换算。这里只放不依赖游戏对象的纯数值函数，
+拾取（鼠标悬停、点击）等热路径都调用这里，便于单独优化。
+"""
+from typing import Optional
+
+
+def pick_tile_index(world_x: int, world_y: int, tile_size: int, grid_w: int, grid_h: int,
+                    tile_shift: Optional[int] = None) -> int:
+    """
+    计算世界像素坐标落在哪个地块上。
+
+    Args:
+        world_x (int): 世界坐标X（已加上相机偏移）。
+        world_y (int): 世界坐标Y（已加上相机偏移）。
+        tile_size (int): 地块边长（像素）。
+        grid_w (int): 网格宽度（地块数）。
+        grid_h (int): 网格高度（地块数）。
+        tile_shift (Optional[int]): 地块边长为2的幂时的位移量，提供时用右移代替整除。
+
+    Returns:
+        int: 行优先一维地块列表中的下标；坐标在网格外时返回 -1。
+    """
+    if tile_shift is not None:
+        grid_x = world_x >> tile_shift
+        grid_y = world_y >> tile_shift
+    else:
+        grid_x = world_x // tile_size
+        grid_y = world_y // tile_size
+    # 负坐标经过右移/整除后同样为负，一次范围比较即可覆盖网格外的所有情况
+    if 0 <= grid_x < grid_w and 0 <= grid_y < grid_h:
+        return grid_y * grid_w + grid_x
+    return -1
@@ -3,12 +3,18 @@
 基础日志模块
 提供一个配置好的logger实例，方便在项目各处使用。
 """
+import atexit
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener # 用于把日志I/O移到后台线程
 from logging.handlers import RotatingFileHandler # 用于日志文件轮转
 
 # --- 配置常量 ---
-LOG_LEVEL = logging.DEBUG  # 日志记录的最低级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+# 日志记录的最低级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+# 默认为 INFO；设置环境变量 GRID_KINGDOM_DEBUG=1 可开启 DEBUG 级别的详细日志
+LOG_LEVEL = logging.DEBUG if os.environ.get("GRID_KINGDOM_DEBUG") else logging.INFO
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - [%(filename)s:%(lineno)d] - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 LOG_FILE_PATH = "grid_kingdom.log"  # 日志文件路径
@@ -25,29 +31,43 @@ logger.setLevel(LOG_LEVEL) # 设置logger处理的最低级别
 # --- 防止重复添加handler ---
 # 如果logger.handlers为空，才添加新的handler
 if not logger.handlers:
+    _output_handlers = []
+
     # --- 控制台Handler ---
     if ENABLE_CONSOLE_LOGGING:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(LOG_LEVEL)
         console_formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        _output_handlers.append(console_handler)
 
     # --- 文件Handler (带轮转功能) ---
     if ENABLE_FILE_LOGGING:
         # RotatingFileHandler会在文件达到一定大小时自动创建新文件
         # maxBytes: 单个日志文件的最大大小 (这里设为5MB)
         # backupCount: 保留的旧日志文件数量
+        # delay: 直到第一条记录真正写出时才打开文件，只导入模块而不记录日志时不产生文件I/O
         file_handler = RotatingFileHandler(
             LOG_FILE_PATH,
             maxBytes=5 * 1024 * 1024, # 5 MB
             backupCount=3,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         file_handler.setLevel(LOG_LEVEL)
         file_formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        _output_handlers.append(file_handler)
+
+    # --- 队列Handler ---
+    # 游戏线程只把日志记录放进队列，控制台输出和写文件由 QueueListener 的后台线程完成，
+    # 主循环不会因为日志I/O而阻塞。程序退出时停止监听线程，确保队列中剩余的记录都被写出
+    if _output_handlers:
+        _log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(_log_queue))
+        _log_listener = QueueListener(_log_queue, *_output_handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
 
 # --- 导出logger实例，方便其他模块使用 ---
 # 使用方法: from grid_kingdom.utils.logger import logger
@@ -2,6 +2,9 @@ import pygame
 import os
 pygame.init()
 pygame.font.init()
+# 主循环只处理 QUIT，屏蔽其余事件类型，鼠标移动等事件不再进入事件队列
+pygame.event.set_blocked(None)
+pygame.event.set_allowed([pygame.QUIT])
 # --- 假设这是你的常量定义 ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # 假设这个测试脚本在项目根目录的tests文件夹
 ASSETS_DIR = os.path.join(os.path.dirname(BASE_DIR), "assets") # 退回到项目根目录再进入assets